@@ -0,0 +1,148 @@
+# -----------------------------------------------------
+# Distances d'édition (Levenshtein) rapides
+# -----------------------------------------------------
+# - distance         : algorithme bit-parallèle de Myers / Hyyrö, une colonne
+#                      de la matrice de programmation dynamique tient dans un
+#                      entier (mots de 64 caractères au plus)
+# - distance_bornee  : programmation dynamique limitée à une bande diagonale,
+#                      arrêtée dès que la distance dépasse distance_max
+# - distances        : un mot contre une liste de candidats (table des
+#                      masques du mot calculée une seule fois)
+
+LONGUEUR_MAX_MYERS = 64
+
+
+def masques(mot):
+    """Pour chaque caractère de mot, masque des positions où il apparaît (bit i = position i)."""
+    peq = {}
+    for i, c in enumerate(mot):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    return peq
+
+
+def _myers(peq, m, candidat, distance_max=None):
+    """
+    Distance entre le mot (de longueur m, de table peq) et candidat.
+    Si distance_max est donné, s'arrête dès que la distance ne peut plus
+    être <= distance_max et renvoie distance_max + 1.
+    """
+    if m == 0:
+        return len(candidat)
+    tous = (1 << m) - 1
+    dernier = 1 << (m - 1)
+    pv, mv, score = tous, 0, m
+    restants = len(candidat)
+    for c in candidat:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & tous)
+        mh = pv & xh
+        if ph & dernier:
+            score += 1
+        elif mh & dernier:
+            score -= 1
+        ph = ((ph << 1) | 1) & tous
+        mh = (mh << 1) & tous
+        pv = mh | (~(xv | ph) & tous)
+        mv = ph & xv
+        restants -= 1
+        # Chaque caractère restant fait baisser le score d'au plus 1
+        if distance_max is not None and score - restants > distance_max:
+            return distance_max + 1
+    return score
+
+
+def distance_bornee(m1, m2, distance_max):
+    """
+    Distance de Levenshtein entre m1 et m2 si elle vaut au plus distance_max,
+    distance_max + 1 sinon. Seule la bande |i - j| <= distance_max de la
+    matrice est calculée, et le calcul s'arrête dès qu'une ligne entière
+    dépasse distance_max.
+    """
+    if abs(len(m1) - len(m2)) > distance_max:
+        return distance_max + 1
+    if len(m1) > len(m2):
+        m1, m2 = m2, m1
+    l1, l2 = len(m1), len(m2)
+    hors_bande = distance_max + 1
+    precedente = [j if j <= distance_max else hors_bande for j in range(l2 + 1)]
+    for i in range(1, l1 + 1):
+        debut = max(1, i - distance_max)
+        fin = min(l2, i + distance_max)
+        courante = [hors_bande] * (l2 + 1)
+        courante[0] = i if i <= distance_max else hors_bande
+        c1 = m1[i - 1]
+        minimum = courante[0]
+        for j in range(debut, fin + 1):
+            d = min(precedente[j] + 1,
+                    courante[j - 1] + 1,
+                    precedente[j - 1] + (c1 != m2[j - 1]))
+            courante[j] = d if d <= distance_max else hors_bande
+            minimum = min(minimum, courante[j])
+        if minimum > distance_max:
+            return hors_bande
+        precedente = courante
+    return precedente[l2]
+
+
+def distance(m1, m2, distance_max=None):
+    """
+    Distance de Levenshtein entre m1 et m2 (bit-parallèle si l'un des deux
+    mots fait au plus 64 caractères). Avec distance_max, renvoie
+    distance_max + 1 dès que la distance le dépasse.
+    """
+    if len(m1) > len(m2):
+        m1, m2 = m2, m1
+    if distance_max is not None and len(m2) - len(m1) > distance_max:
+        return distance_max + 1
+    if len(m1) <= LONGUEUR_MAX_MYERS:
+        return _myers(masques(m1), len(m1), m2, distance_max)
+    if distance_max is not None:
+        return distance_bornee(m1, m2, distance_max)
+    return distance_bornee(m1, m2, len(m2))
+
+
+def distances(mot, candidats, distance_max=None):
+    """
+    Distances de mot à chacun des candidats (liste dans le même ordre).
+    La table des masques de mot est construite une fois pour tout le lot ;
+    avec distance_max, les candidats trop éloignés valent distance_max + 1.
+    """
+    if len(mot) > LONGUEUR_MAX_MYERS:
+        return [distance(mot, candidat, distance_max) for candidat in candidats]
+    peq, m = masques(mot), len(mot)
+    resultat = []
+    for candidat in candidats:
+        if distance_max is not None and abs(len(candidat) - m) > distance_max:
+            resultat.append(distance_max + 1)
+        else:
+            resultat.append(_myers(peq, m, candidat, distance_max))
+    return resultat
+
+
+def plus_proche(mot, candidats, distance_max=None):
+    """
+    Candidat le plus proche de mot et sa distance (le premier en cas d'égalité),
+    ou (None, None) si aucun candidat n'est à distance <= distance_max.
+    """
+    if len(mot) > LONGUEUR_MAX_MYERS:
+        calculer = lambda candidat, borne: distance(mot, candidat, borne)
+    else:
+        peq, m = masques(mot), len(mot)
+        calculer = lambda candidat, borne: _myers(peq, m, candidat, borne)
+
+    meilleur, meilleure_distance = None, None
+    for candidat in candidats:
+        if distance_max is not None and abs(len(candidat) - len(mot)) > distance_max:
+            continue
+        d = calculer(candidat, distance_max)
+        if distance_max is not None and d > distance_max:
+            continue
+        if meilleure_distance is None or d < meilleure_distance:
+            meilleur, meilleure_distance = candidat, d
+            # Seul un candidat strictement plus proche peut encore remplacer celui-ci
+            distance_max = d - 1
+            if d == 0:
+                break
+    return meilleur, meilleure_distance
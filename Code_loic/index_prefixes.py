@@ -0,0 +1,59 @@
+from bisect import bisect_left
+
+
+# -----------------------------------------------------
+# Index des formes par longueur et par préfixe
+# -----------------------------------------------------
+class IndexPrefixes:
+    """
+    Formes d'un lexique regroupées par longueur, chaque groupe trié par ordre
+    alphabétique : les formes qui commencent par un préfixe donné y sont
+    contiguës et se trouvent par recherche dichotomique (un trie compacté
+    dans des listes triées).
+
+    candidats() énumère exactement les formes que recherche_proximite (ou le
+    score de préfixe du SpellCorrector) ne rejette pas, en O(fenêtre de
+    longueurs x log n + nombre de candidats) au lieu d'un parcours du lexique.
+    Les formes sont désignées par leur rang dans le lexique d'origine.
+    """
+
+    def __init__(self, formes):
+        self.formes = list(formes)
+        par_longueur = {}
+        for rang, forme in enumerate(self.formes):
+            par_longueur.setdefault(len(forme), []).append((forme, rang))
+        self.par_longueur = {}
+        for longueur, groupe in par_longueur.items():
+            groupe.sort()
+            self.par_longueur[longueur] = ([forme for forme, _ in groupe], [rang for _, rang in groupe])
+
+    def _prefixe(self, longueur, prefixe):
+        """Rangs des formes de la longueur donnée qui commencent par prefixe."""
+        formes, rangs = self.par_longueur[longueur]
+        debut = bisect_left(formes, prefixe)
+        fin = bisect_left(formes, prefixe + "\U0010ffff")
+        return rangs[debut:fin]
+
+    def candidats(self, mot, seuil_min=3, seuil_max=4, pourcentage_min=0):
+        """
+        Rangs (dans l'ordre du lexique) des formes f telles que :
+        - len(mot) >= seuil_min et len(f) >= seuil_min
+        - |len(mot) - len(f)| <= seuil_max
+        - mot et f ont un préfixe commun non vide, d'au moins pourcentage_min %
+          de la longueur du plus long des deux
+        (mêmes conditions que recherche_proximite(mot, f, seuil_min, seuil_max) != 0).
+        """
+        l = len(mot)
+        if l < seuil_min:
+            return []
+        rangs = []
+        for longueur in range(max(seuil_min, l - seuil_max), l + seuil_max + 1):
+            if longueur not in self.par_longueur:
+                continue
+            # Plus petit préfixe commun p tel que 100 * p / max(l, longueur) >= pourcentage_min
+            p = max(1, -(-pourcentage_min * max(l, longueur) // 100))
+            if p > min(l, longueur):
+                continue
+            rangs.extend(self._prefixe(longueur, mot[:p]))
+        rangs.sort()
+        return rangs
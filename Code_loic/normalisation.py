@@ -0,0 +1,18 @@
+import unicodedata
+
+
+# -----------------------------------------------------
+# Clés de recherche sans accents ni majuscules
+# -----------------------------------------------------
+def plier(mot):
+    """Clé de mot insensible aux accents et à la casse (ex: 'Systèmes' -> 'systemes')."""
+    decompose = unicodedata.normalize("NFKD", mot)
+    return "".join(c for c in decompose if not unicodedata.combining(c)).lower()
+
+
+def regrouper_par_cle(termes):
+    """Dictionnaire clé pliée -> termes qui ont cette clé (dans l'ordre de termes)."""
+    groupes = {}
+    for terme in termes:
+        groupes.setdefault(plier(terme), []).append(terme)
+    return groupes
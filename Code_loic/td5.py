@@ -1,14 +1,30 @@
 import pandas as pd
 from pathlib import Path
 import string
-import spacy
+import hashlib
+import pickle
+import struct
+import zlib
 from collections import Counter
 
+from cache import CacheLRU
+from distance import distance, plus_proche
+from index_prefixes import IndexPrefixes
+from normalisation import plier, regrouper_par_cle
+
 # --- Configuration ---
 # Fichier de tokens bruts (sortie de la tokenisation spaCy du TD3 AVANT filtrage par anti-dictionnaire)
 # C'est ce fichier qui servira à construire le lexique forme -> lemme
 TOKENS_SOURCE_FOR_LEXICON_FILE = Path("td3_tokens.tsv") # Doit être le fichier avant suppression des stop-words du TD3
 
+# Lexique déjà construit (word_to_lemma, all_known_lemmas, lemma_frequencies), sérialisé :
+# au démarrage suivant il est relu en quelques millisecondes, sans importer spaCy.
+LEXICON_ARTIFACT_FILE = Path("td5_lexicon.bin")
+LEXICON_MAGIC = b"LO17LEX\x00"
+LEXICON_FORMAT_VERSION = 1
+# magic, version du format, taille de la charge utile, sha256 de la charge utile
+LEXICON_HEADER = struct.Struct("<8sHQ32s")
+
 # Seuils
 LEVENSHTEIN_MAX_DIST_PRIMARY = 1  # Distance max pour la correction principale (ED1)
 LEVENSHTEIN_MAX_DIST_SECONDARY = 2 # Distance max si ED1 ne donne rien et qu'on utilise une autre méthode
@@ -17,24 +33,67 @@ PREFIX_MIN_LEN = 3
 PREFIX_DIFF_MAX_LEN = 4
 PREFIX_COMMON_MIN_PERCENT = 60
 
-# Charger le modèle spaCy une seule fois
-try:
-    NLP_SPACY = spacy.load("fr_core_news_sm")
-    print("Modèle spaCy 'fr_core_news_sm' chargé pour TD5.")
-except OSError:
-    print("ERREUR TD5: Modèle spaCy 'fr_core_news_sm' non trouvé.")
-    NLP_SPACY = exit()
+CORRECTION_CACHE_SIZE = 8192 # Nombre max de mots dont la correction est gardée en mémoire
+
+# Le modèle spaCy n'est chargé (une seule fois) que lorsqu'on en a besoin :
+# construction du lexique ou tokenisation d'une phrase
+NLP_SPACY = None
+
+def get_nlp():
+    """Modèle spaCy 'fr_core_news_sm', chargé au premier appel (None s'il est indisponible)."""
+    global NLP_SPACY
+    if NLP_SPACY is None:
+        try:
+            import spacy
+            NLP_SPACY = spacy.load("fr_core_news_sm")
+            print("Modèle spaCy 'fr_core_news_sm' chargé pour TD5.")
+        except (ImportError, OSError):
+            print("ERREUR TD5: Modèle spaCy 'fr_core_news_sm' non trouvé.")
+            NLP_SPACY = False
+    return NLP_SPACY or None
+
+def _source_signature(path: Path) -> tuple[int, int] | None:
+    """Taille et date de modification du fichier de tokens (None s'il est absent)."""
+    if not path or not path.is_file():
+        return None
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
 
 class SpellCorrector:
-    def __init__(self, tokens_source_path: Path):
+    def __init__(self, tokens_source_path: Path, lexicon_path: Path = LEXICON_ARTIFACT_FILE,
+                 cache_size: int = CORRECTION_CACHE_SIZE):
         self.word_to_lemma = {} # Dictionnaire principal: {forme_tokenisée: lemme}
         self.all_known_lemmas = set() # Ensemble de tous les lemmes valides
         self.lemma_frequencies = Counter() # sert à départager des candidats
+        # Résultats de correct_word (corrections comme échecs), par (version du lexique, mot normalisé)
+        self.lexicon_version = 0
+        self.correction_cache = CacheLRU(cache_size)
 
-        if NLP_SPACY and tokens_source_path and tokens_source_path.is_file():
+        source_signature = _source_signature(tokens_source_path)
+        if lexicon_path and self.load_lexicon(lexicon_path, source_signature):
+            print(f"Lexique relu depuis '{lexicon_path}' ({len(self.word_to_lemma)} formes).")
+        elif source_signature is not None and get_nlp():
             self._build_lexicon_from_tokens_and_spacy(tokens_source_path)
+            self._lexicon_changed()
+            if lexicon_path and self.word_to_lemma:
+                self.save_lexicon(lexicon_path, source_signature)
         else:
             print(f"WARN: Fichier de tokens source '{tokens_source_path}' non fourni, non trouvé ou modèle spaCy non chargé.")
+            self._lexicon_changed()
+
+    def _lexicon_changed(self):
+        """À appeler après toute modification du lexique : reconstruit l'index et invalide le cache."""
+        # Formes groupées par longueur et triées : candidats par préfixe sans parcourir tout le lexique
+        self.prefix_index = IndexPrefixes(self.word_to_lemma.keys())
+        # Formes et lemmes regroupés par clé sans accents ni majuscules ("systemes" -> ["systèmes"])
+        self.folded_forms = regrouper_par_cle(self.word_to_lemma.keys())
+        self.folded_lemmas = regrouper_par_cle(sorted(self.all_known_lemmas))
+        self.lexicon_version += 1
+        self.correction_cache.vider()
+
+    def cache_statistics(self) -> dict:
+        """Entrées, succès, échecs et taux de succès du cache de correct_word."""
+        return self.correction_cache.statistiques()
 
     def _build_lexicon_from_tokens_and_spacy(self, file_path: Path):
         """
@@ -61,7 +120,7 @@ class SpellCorrector:
            
             batch_size = 10000
             for i in range(0, len(all_tokens_in_corpus), batch_size):
-                batch_docs = NLP_SPACY.pipe(all_tokens_in_corpus[i:i+batch_size], disable=["parser", "ner"])
+                batch_docs = get_nlp().pipe(all_tokens_in_corpus[i:i+batch_size], disable=["parser", "ner"])
                 for doc in batch_docs:
                     if len(doc) > 0: # Chaque "mot" du TSV devrait être un token
                         lemmas_for_frequency_counting.append(doc[0].lemma_.lower())
@@ -74,7 +133,7 @@ class SpellCorrector:
             
             unique_forms_list = list(unique_original_forms)
             for i in range(0, len(unique_forms_list), batch_size):
-                batch_docs_unique = NLP_SPACY.pipe(unique_forms_list[i:i+batch_size], disable=["parser", "ner"])
+                batch_docs_unique = get_nlp().pipe(unique_forms_list[i:i+batch_size], disable=["parser", "ner"])
                 for doc_unique in batch_docs_unique:
                     if len(doc_unique) > 0:
                         original_form_lower = doc_unique.text.lower() # La forme telle qu'elle était, en minuscule
@@ -100,27 +159,64 @@ class SpellCorrector:
             traceback.print_exc() # Imprime la trace complète de l'erreur
 
 
+    def save_lexicon(self, lexicon_path: Path, source_signature: tuple[int, int] | None = None):
+        """
+        Écrit le lexique dans un fichier binaire : en-tête (magic, version du format,
+        taille et sha256 de la charge utile) puis charge utile pickle compressée par zlib.
+        """
+        payload = zlib.compress(pickle.dumps({
+            "source_signature": source_signature,
+            "word_to_lemma": self.word_to_lemma,
+            "all_known_lemmas": sorted(self.all_known_lemmas),
+            "lemma_frequencies": dict(self.lemma_frequencies),
+        }, protocol=pickle.HIGHEST_PROTOCOL))
+        header = LEXICON_HEADER.pack(LEXICON_MAGIC, LEXICON_FORMAT_VERSION, len(payload),
+                                     hashlib.sha256(payload).digest())
+        try:
+            with open(lexicon_path, "wb") as f:
+                f.write(header + payload)
+            print(f"Lexique sérialisé dans '{lexicon_path}'.")
+        except OSError as e:
+            print(f"WARN: Impossible d'écrire le lexique dans '{lexicon_path}' : {e}")
+
+    def load_lexicon(self, lexicon_path: Path, source_signature: tuple[int, int] | None = None) -> bool:
+        """
+        Relit un lexique écrit par save_lexicon. Renvoie False (sans rien modifier) si le
+        fichier est absent, d'une autre version du format, corrompu (somme de contrôle),
+        ou construit à partir d'un autre fichier de tokens que celui fourni.
+        """
+        try:
+            with open(lexicon_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        if len(data) < LEXICON_HEADER.size:
+            return False
+        magic, version, size, checksum = LEXICON_HEADER.unpack_from(data)
+        payload = data[LEXICON_HEADER.size:]
+        if magic != LEXICON_MAGIC or version != LEXICON_FORMAT_VERSION or size != len(payload):
+            return False
+        if hashlib.sha256(payload).digest() != checksum:
+            print(f"WARN: Lexique '{lexicon_path}' corrompu (somme de contrôle), reconstruction.")
+            return False
+        content = pickle.loads(zlib.decompress(payload))
+        if source_signature is not None and content["source_signature"] != source_signature:
+            return False
+        self.word_to_lemma = content["word_to_lemma"]
+        self.all_known_lemmas = set(content["all_known_lemmas"])
+        self.lemma_frequencies = Counter(content["lemma_frequencies"])
+        self._lexicon_changed()
+        return True
+
     def _normalize_input_word(self, word: str) -> str:
         """Normalise un mot en entrée pour la correction (minuscule, sans ponctuation externe)."""
         # La tokenisation de la phrase d'entrée via spaCy devrait déjà bien gérer la ponctuation.
         # Cette fonction est pour s'assurer que le mot est propre avant de chercher dans le lexique.
         return word.lower().strip(string.punctuation + string.whitespace)
 
-    def _levenshtein_distance(self, s1: str, s2: str) -> int:
-        if len(s1) < len(s2):
-            return self._levenshtein_distance(s2, s1)
-        if len(s2) == 0:
-            return len(s1)
-        previous_row = range(len(s2) + 1)
-        for i, c1 in enumerate(s1):
-            current_row = [i + 1]
-            for j, c2 in enumerate(s2):
-                insertions = previous_row[j + 1] + 1
-                deletions = current_row[j] + 1
-                substitutions = previous_row[j] + (c1 != c2)
-                current_row.append(min(insertions, deletions, substitutions))
-            previous_row = current_row
-        return previous_row[-1]
+    def _levenshtein_distance(self, s1: str, s2: str, max_dist: int = None) -> int:
+        # Myers bit-parallèle (module distance) ; au-delà de max_dist, renvoie max_dist + 1
+        return distance(s1, s2, max_dist)
 
     def _edits1(self, word):
         """Génère tous les mots à une distance d'édition de 1."""
@@ -152,6 +248,14 @@ class SpellCorrector:
         if not normalized_word:
             return None, "Mot vide après normalisation."
 
+        key = (self.lexicon_version, normalized_word)
+        result = self.correction_cache.get(key)
+        if result is None:
+            result = self._correct_normalized_word(normalized_word)
+            self.correction_cache.put(key, result)
+        return result
+
+    def _correct_normalized_word(self, normalized_word: str) -> tuple[str | None, str]:
         if not self.all_known_lemmas: # Si le lexique n'a pas pu être chargé
             return normalized_word, "Lexique vide (mot original retourné)."
 
@@ -161,6 +265,15 @@ class SpellCorrector:
         if normalized_word in self.word_to_lemma:
             return self.word_to_lemma[normalized_word], "Forme trouvée dans le lexique, lemme retourné."
 
+        # 1 bis. Mot tapé sans accents : recherche par clé pliée, sans calcul de distance
+        folded_word = plier(normalized_word)
+        if folded_word in self.folded_lemmas:
+            lemma = plus_proche(normalized_word, self.folded_lemmas[folded_word])[0]
+            return lemma, f"Lemme trouvé sans accents -> {lemma}"
+        if folded_word in self.folded_forms:
+            form = plus_proche(normalized_word, self.folded_forms[folded_word])[0]
+            return self.word_to_lemma[form], f"Forme trouvée sans accents ('{form}'), lemme retourné."
+
         # 2. Générer les candidats à distance 1 et vérifier s'ils sont des lemmes connus
         candidates_ed1 = self._known(self._edits1(normalized_word))
         
@@ -176,7 +289,10 @@ class SpellCorrector:
 
         prefix_candidates_details = []
         # On cherche les préfixes sur les clés de word_to_lemma (les formes tokenisées)
-        for known_form, lemme_associe in self.word_to_lemma.items():
+        for rank in self.prefix_index.candidats(normalized_word, PREFIX_MIN_LEN, PREFIX_DIFF_MAX_LEN,
+                                                PREFIX_COMMON_MIN_PERCENT):
+            known_form = self.prefix_index.formes[rank]
+            lemme_associe = self.word_to_lemma[known_form]
             score = self._prefix_similarity_score(normalized_word, known_form)
             if score >= PREFIX_COMMON_MIN_PERCENT:
                 prefix_candidates_details.append({'mot_lexique_form': known_form, 'lemme': lemme_associe, 'score_prefixe': score})
@@ -187,7 +303,7 @@ class SpellCorrector:
             levenshtein_from_prefix = []
             # Tester Levenshtein sur les N meilleurs candidats par préfixe pour limiter le coût
             for cand_info in prefix_candidates_details[:10]: # Ex: sur les 10 meilleurs préfixes
-                dist = self._levenshtein_distance(normalized_word, cand_info['mot_lexique_form'])
+                dist = self._levenshtein_distance(normalized_word, cand_info['mot_lexique_form'], LEVENSHTEIN_MAX_DIST_SECONDARY)
                 if dist <= LEVENSHTEIN_MAX_DIST_SECONDARY : # Utiliser un seuil potentiellement différent
                     levenshtein_from_prefix.append({
                         'lemme': cand_info['lemme'], 
@@ -207,36 +323,60 @@ class SpellCorrector:
 
     def correct_sentence(self, sentence: str) -> list[tuple[str, str | None, str]]:
         """Corrige une phrase en tokenisant avec spaCy et en corrigeant chaque mot."""
+        return self.correct_many([sentence])[0]
 
-        doc = NLP_SPACY(sentence)
-        corrections = []
-        for token_spacy in doc:
-            original_form = token_spacy.text
-            
-            # On ne corrige que les mots (pas la ponctuation, etc.)
-            if token_spacy.is_punct or token_spacy.is_space:
-                # On peut choisir de les garder tels quels ou de les ignorer dans la sortie
-                # Pour l'instant, on les ignore pour se concentrer sur la correction des mots.
-                # Si on veut les garder : corrections.append((original_form, original_form, "Ponctuation/Espace"))
-                continue
-
-            normalized_for_correction = self._normalize_input_word(original_form)
-            if not normalized_for_correction:
-                corrections.append((original_form, None, "Token original vide/ponctuation après normalisation"))
-                continue
-                
-            corrected_lemme, method = self.correct_word(normalized_for_correction)
-            corrections.append((original_form, corrected_lemme, method))
-        return corrections
+    def _tokenize_many(self, sentences: list[str], batch_size: int, n_process: int) -> list[list[str]]:
+        """Mots (hors ponctuation et espaces) de chaque phrase, tokenisées par lots avec nlp.pipe."""
+        nlp = get_nlp()
+        if nlp is None:
+            # Sans spaCy : découpage sur les espaces, la ponctuation est retirée par la normalisation
+            return [[token for token in sentence.split() if self._normalize_input_word(token)]
+                    for sentence in sentences]
+
+        # Seule la tokenisation sert ici : les composants du pipeline sont désactivés
+        docs = nlp.pipe(sentences, batch_size=batch_size, n_process=n_process, disable=nlp.pipe_names)
+        # On ne corrige que les mots (pas la ponctuation, etc.)
+        return [[token_spacy.text for token_spacy in doc if not (token_spacy.is_punct or token_spacy.is_space)]
+                for doc in docs]
+
+    def correct_many(self, sentences: list[str], batch_size: int = 1000,
+                     n_process: int = 1) -> list[list[tuple[str, str | None, str]]]:
+        """
+        Corrige une liste de phrases (journal de requêtes, évaluation...).
+        La tokenisation passe par nlp.pipe (batch_size phrases par lot, n_process
+        processus) ; chaque mot distinct du lot n'est corrigé qu'une fois, puis
+        les résultats sont redistribués phrase par phrase, dans le format de
+        correct_sentence.
+        """
+        tokenized = self._tokenize_many(list(sentences), batch_size, n_process)
+
+        corrections_by_word = {}
+        for tokens in tokenized:
+            for original_form in tokens:
+                normalized_for_correction = self._normalize_input_word(original_form)
+                if normalized_for_correction and normalized_for_correction not in corrections_by_word:
+                    corrections_by_word[normalized_for_correction] = self.correct_word(normalized_for_correction)
+
+        results = []
+        for tokens in tokenized:
+            corrections = []
+            for original_form in tokens:
+                normalized_for_correction = self._normalize_input_word(original_form)
+                if not normalized_for_correction:
+                    corrections.append((original_form, None, "Token original vide/ponctuation après normalisation"))
+                    continue
+                corrected_lemme, method = corrections_by_word[normalized_for_correction]
+                corrections.append((original_form, corrected_lemme, method))
+            results.append(corrections)
+        return results
 
 if __name__ == "__main__":
     print("=== DÉBUT TEST TD5 : Correcteur Orthographique ===")
     
-    if not NLP_SPACY:
-        print("Arrêt du script : Modèle spaCy requis mais non chargé.")
+    corrector = SpellCorrector(tokens_source_path=TOKENS_SOURCE_FOR_LEXICON_FILE)
+    if not corrector.all_known_lemmas and not get_nlp():
+        print("Arrêt du script : lexique sérialisé absent et modèle spaCy requis mais non chargé.")
     else:
-        corrector = SpellCorrector(tokens_source_path=TOKENS_SOURCE_FOR_LEXICON_FILE)
-
         if not corrector.all_known_lemmas:
             print("\nATTENTION: Le lexique est vide ou n'a pas pu être construit.")
             print("Les tests de correction ne seront pas significatifs.")
@@ -138,14 +138,16 @@ def create_reverse_index_titres(corpus, output_titres):
             if "<titre>" in ligne:
                 texte = clean_contenu(ligne.replace("<titre>", "").replace("</titre>", ""))
                 for mot in texte.split():
-                    index.setdefault(mot, []).append(doc_id)
+                    docs = index.setdefault(mot, [])
+                    # Le corpus est lu document par document : un doublon est forcément le dernier élément
+                    if not docs or docs[-1] != doc_id:
+                        docs.append(doc_id)
 
     with open(output_titres, "w", encoding="utf-8") as f_w:
         f_w.write("mot\tdocs\n")
         for key, tab in index.items():
             f_w.write(key + "\t" + str(tab) + "\n")
 
-create_reverse_index_titres("corpus_post_lems.XML", "reverse_index_titre.csv")
 
 # ------------------------------------------------------
 # Création d'index inversé pour le texte
@@ -159,14 +161,16 @@ def create_reverse_index_texte(corpus, output_texte):
             if "<texte>" in ligne:
                 texte = clean_contenu(ligne.replace("<texte>", "").replace("</texte>", ""))
                 for mot in texte.split():
-                    index.setdefault(mot, []).append(doc_id)
+                    docs = index.setdefault(mot, [])
+                    # Le corpus est lu document par document : un doublon est forcément le dernier élément
+                    if not docs or docs[-1] != doc_id:
+                        docs.append(doc_id)
 
     with open(output_texte, "w", encoding="utf-8") as f_w:
         f_w.write("mot\tdocs\n")
         for key, tab in index.items():
             f_w.write(key + "\t" + str(tab) + "\n")
 
-create_reverse_index_texte("corpus_post_lems.XML", "reverse_index_texte.csv")
 
 # ------------------------------------------------------
 # Création d'index inversé pour les dates
@@ -186,7 +190,6 @@ def create_reverse_index_date(corpus, output_date):
         for key, tab in index.items():
             f_w.write(key.lower() + "\t" + str(tab) + "\n")
 
-create_reverse_index_date("corpus_post_lems.XML", "reverse_index_date.csv")
 
 # ------------------------------------------------------
 # Création d'index inversé pour les rubriques
@@ -206,7 +209,6 @@ def create_reverse_index_rubrique(corpus, output_rubrique):
         for key, tab in index.items():
             f_w.write(key.lower().strip() + "\t" + str(tab) + "\n")
 
-create_reverse_index_rubrique("corpus_post_lems.XML", "reverse_index_rubrique.csv")
 
 # ------------------------------------------------------
 # Création d'index inversé pour les images
@@ -233,4 +235,110 @@ def create_reverse_index_images(corpus, output_image):
         for key, tab in index.items():
             f_w.write(key.lower() + "\t" + str(tab) + "\n")
 
-create_reverse_index_images("corpus_post_lems.XML", "reverse_index_image.csv")
+# ------------------------------------------------------
+# Création de tous les index inversés en une seule passe
+def write_reverse_index(index, output, lower=False):
+    """
+    Écrit un index inversé {clé: [docs]} au format TSV (mot, docs) du TD4.
+    Les clés identiques après mise en minuscules sont regroupées.
+    """
+    if lower:
+        index_lower = {}
+        for key, tab in index.items():
+            # Dictionnaire utilisé comme ensemble ordonné : doublons écartés sans parcourir la liste
+            index_lower.setdefault(key.lower().strip(), {}).update(dict.fromkeys(tab))
+        index = {key: list(docs) for key, docs in index_lower.items()}
+
+    with open(output, "w", encoding="utf-8") as f_w:
+        f_w.write("mot\tdocs\n")
+        for key, tab in index.items():
+            f_w.write(key + "\t" + str(tab) + "\n")
+
+
+def write_positions(index, output):
+    """
+    Écrit un index positionnel {mot: {doc: [positions]}} au format TSV (mot, positions),
+    la colonne positions étant la représentation d'un dictionnaire {doc: [positions]}.
+    """
+    with open(output, "w", encoding="utf-8") as f_w:
+        f_w.write("mot\tpositions\n")
+        for key, docs in index.items():
+            f_w.write(key + "\t" + str(docs) + "\n")
+
+
+def create_reverse_indexes(corpus, output_dir=".", output_docs="docs.csv", positions=False):
+    """
+    Parcourt le corpus une seule fois, ligne par ligne (sans readlines), et
+    produit en même temps les index inversés des titres, du texte, des dates,
+    des rubriques et des images, ainsi qu'un fichier de métadonnées par
+    document (date, rubrique, images, nombre de mots du titre et du texte).
+
+    Les fichiers écrits ont le même format que ceux des fonctions
+    create_reverse_index_* ci-dessus. Avec positions=True (désactivé par
+    défaut, car plus de deux fois plus lent), la position de chaque mot dans
+    le titre et dans le texte de son document est aussi enregistrée
+    (reverse_index_titre_positions.csv, reverse_index_texte_positions.csv),
+    ce qui permet de rechercher des expressions ("réalité virtuelle").
+    """
+    index_titre, index_texte, index_date, index_rubrique = {}, {}, {}, {}
+    index_image = {"yes": [], "no": []}
+    positions_titre, positions_texte = {}, {}
+    docs = []
+
+    def ajouter(index, mot, doc_id):
+        tab = index.setdefault(mot, [])
+        # Le corpus est lu document par document : un doublon est forcément le dernier élément
+        if not tab or tab[-1] != doc_id:
+            tab.append(doc_id)
+
+    with open(corpus, "r", encoding="utf-8") as f:
+        doc_id = 0
+        meta = {}
+        for ligne in f:
+            if "<bulletin>" in ligne:
+                meta = {"doc": None, "date": "", "rubrique": "", "images": "no",
+                        "longueur_titre": 0, "longueur_texte": 0}
+            if "<fichier>" in ligne:
+                doc_id = ligne[9:14]
+                meta["doc"] = doc_id
+            if "<titre>" in ligne:
+                mots = clean_contenu(ligne.replace("<titre>", "").replace("</titre>", "")).split()
+                for i, mot in enumerate(mots):
+                    ajouter(index_titre, mot, doc_id)
+                    if positions:
+                        positions_titre.setdefault(mot, {}).setdefault(doc_id, []).append(meta["longueur_titre"] + i)
+                meta["longueur_titre"] += len(mots)
+            if "<texte>" in ligne:
+                mots = clean_contenu(ligne.replace("<texte>", "").replace("</texte>", "")).split()
+                for i, mot in enumerate(mots):
+                    ajouter(index_texte, mot, doc_id)
+                    if positions:
+                        positions_texte.setdefault(mot, {}).setdefault(doc_id, []).append(meta["longueur_texte"] + i)
+                meta["longueur_texte"] += len(mots)
+            if "<date>" in ligne:
+                date = ligne.replace("<date>", "").replace("</date>", "").strip()
+                index_date.setdefault(date, []).append(doc_id)
+                meta["date"] = date
+            if "<rubrique>" in ligne:
+                rubrique = ligne.replace("<rubrique>", "").replace("</rubrique>", "").strip()
+                index_rubrique.setdefault(rubrique, []).append(doc_id)
+                meta["rubrique"] = rubrique.lower()
+            if "<images>" in ligne:
+                meta["images"] = "yes"
+            if "</bulletin>" in ligne:
+                index_image[meta["images"]].append(doc_id)
+                docs.append(meta)
+
+    write_reverse_index(index_titre, f"{output_dir}/reverse_index_titre.csv")
+    write_reverse_index(index_texte, f"{output_dir}/reverse_index_texte.csv")
+    write_reverse_index(index_date, f"{output_dir}/reverse_index_date.csv", lower=True)
+    write_reverse_index(index_rubrique, f"{output_dir}/reverse_index_rubrique.csv", lower=True)
+    write_reverse_index(index_image, f"{output_dir}/reverse_index_image.csv")
+    pd.DataFrame(docs).to_csv(f"{output_dir}/{output_docs}", sep="\t", index=False, encoding="utf-8")
+    if positions:
+        write_positions(positions_titre, f"{output_dir}/reverse_index_titre_positions.csv")
+        write_positions(positions_texte, f"{output_dir}/reverse_index_texte_positions.csv")
+
+create_reverse_indexes("corpus_post_lems.XML")
+# Index positionnels pour les expressions du TD7 (plus lent) :
+# create_reverse_indexes("corpus_post_lems.XML", positions=True)
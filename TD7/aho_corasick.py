@@ -0,0 +1,85 @@
+from collections import deque
+
+
+# -----------------------------------------------------
+# Automate d'Aho-Corasick : tous les mots-repères en un seul parcours
+# -----------------------------------------------------
+class AutomateAhoCorasick:
+    """
+    Reconnaît simultanément toutes les expressions de plusieurs listes de
+    mots-repères (une liste par catégorie).
+
+    Les expressions sont rangées dans un arbre des préfixes ; chaque état
+    reçoit un lien d'échec (plus long suffixe qui est aussi un préfixe) et
+    les transitions sont complétées une fois pour toutes : le parcours d'un
+    texte ne fait qu'une recherche dans un dictionnaire par caractère, quel
+    que soit le nombre d'expressions.
+    """
+
+    def __init__(self, reperes_par_categorie):
+        self.categories = {categorie: list(reperes) for categorie, reperes in reperes_par_categorie.items()}
+        # Rangs de chaque repère dans la liste de sa catégorie
+        self.rangs = {categorie: {} for categorie in self.categories}
+        transitions = [{}]
+        sorties = [[]]
+
+        # Arbre des préfixes
+        for categorie, reperes in self.categories.items():
+            for rang, repere in enumerate(reperes):
+                etat = 0
+                for c in repere:
+                    suivant = transitions[etat].get(c)
+                    if suivant is None:
+                        suivant = len(transitions)
+                        transitions[etat][c] = suivant
+                        transitions.append({})
+                        sorties.append([])
+                    etat = suivant
+                sorties[etat].append((repere, categorie, rang))
+                self.rangs[categorie].setdefault(repere, []).append(rang)
+
+        # Liens d'échec (parcours en largeur) et transitions complétées :
+        # un caractère sans transition mène là où mènerait le lien d'échec
+        echec = [0] * len(transitions)
+        completes = [dict(t) for t in transitions]
+        file = deque(transitions[0].values())
+        while file:
+            etat = file.popleft()
+            for c, suivant in transitions[etat].items():
+                file.append(suivant)
+                repli = echec[etat]
+                while repli and c not in transitions[repli]:
+                    repli = echec[repli]
+                cible = transitions[repli].get(c, 0)
+                echec[suivant] = cible if cible != suivant else 0
+                # Les expressions reconnues par le lien d'échec finissent aussi ici
+                sorties[suivant] = sorties[suivant] + sorties[echec[suivant]]
+            for c, cible in completes[echec[etat]].items():
+                completes[etat].setdefault(c, cible)
+
+        # Les états qui reconnaissent une expression sont renumérotés en
+        # dernier : le parcours les repère par une simple comparaison
+        ordre = sorted(range(len(completes)), key=lambda etat: bool(sorties[etat]))
+        numero = {ancien: nouveau for nouveau, ancien in enumerate(ordre)}
+        self._suivants = [
+            {c: numero[cible] for c, cible in completes[ancien].items()}.get for ancien in ordre
+        ]
+        self._sorties = [tuple(sorties[ancien]) for ancien in ordre]
+        self._premier_final = next((n for n, s in enumerate(self._sorties) if s), len(ordre))
+
+    def correspondances(self, texte):
+        """
+        Toutes les occurrences (position, repère, catégorie) des repères dans
+        texte, chevauchements compris, triées par position puis dans l'ordre
+        des listes.
+        """
+        suivants, sorties, premier_final = self._suivants, self._sorties, self._premier_final
+        trouvees = []
+        etat = 0
+        for fin, c in enumerate(texte, 1):
+            etat = suivants[etat](c, 0)
+            if etat >= premier_final:
+                for repere, categorie, rang in sorties[etat]:
+                    trouvees.append((fin - len(repere), rang, repere, categorie))
+        trouvees.sort()
+        return [(position, repere, categorie) for position, _, repere, categorie in trouvees]
@@ -0,0 +1,219 @@
+import argparse
+import contextlib
+import csv
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from distance import plus_proche
+from lexique import Lexique
+from normalisation import plier
+from td5 import _corriger, correction_orthographique, corriger_sans_table, recherche_proximite
+
+
+# -----------------------------------------------------
+# Générateur de fautes de frappe
+# -----------------------------------------------------
+LETTRES = "abcdefghijklmnopqrstuvwxyzéèêàùçô"
+TYPES_FAUTES = ["insertion", "suppression", "substitution", "transposition", "accent"]
+
+
+def appliquer_faute(mot, type_faute, rng):
+    """Applique une faute du type donné à mot (renvoie mot inchangé si elle est impossible)."""
+    if type_faute == "insertion":
+        i = rng.randrange(len(mot) + 1)
+        return mot[:i] + rng.choice(LETTRES) + mot[i:]
+    if type_faute == "suppression" and len(mot) > 1:
+        i = rng.randrange(len(mot))
+        return mot[:i] + mot[i + 1:]
+    if type_faute == "substitution":
+        i = rng.randrange(len(mot))
+        return mot[:i] + rng.choice([c for c in LETTRES if c != mot[i]]) + mot[i + 1:]
+    if type_faute == "transposition" and len(mot) > 1:
+        i = rng.randrange(len(mot) - 1)
+        if mot[i] != mot[i + 1]:
+            return mot[:i] + mot[i + 1] + mot[i] + mot[i + 2:]
+    if type_faute == "accent":
+        accents = [i for i, c in enumerate(mot) if plier(c) != c]
+        if accents:
+            i = rng.choice(accents)
+            return mot[:i] + plier(mot[i]) + mot[i + 1:]
+    return mot
+
+
+def generer_fautes(formes, n, distance_max, types, rng):
+    """
+    n couples (mot d'origine, mot fautif, nombre de fautes, types appliqués) :
+    chaque mot, tiré dans formes, reçoit de 1 à distance_max fautes des types donnés.
+    """
+    echantillon = []
+    while len(echantillon) < n:
+        mot = rng.choice(formes)
+        if len(mot) < 3:
+            continue
+        nombre = rng.randint(1, distance_max)
+        fautif, appliques = mot, []
+        for _ in range(nombre):
+            type_faute = rng.choice(types)
+            nouveau = appliquer_faute(fautif, type_faute, rng)
+            if nouveau != fautif:
+                fautif = nouveau
+                appliques.append(type_faute)
+        if appliques:
+            echantillon.append((mot, fautif, len(appliques), "+".join(sorted(set(appliques)))))
+    return echantillon
+
+
+# -----------------------------------------------------
+# Méthodes de correction comparées
+# -----------------------------------------------------
+def correction_parcours(mot, lexique):
+    """Algorithme d'origine (parcours de tout le lexique), sur le lexique déjà chargé."""
+    candidats = [forme for forme in lexique.formes if recherche_proximite(mot, forme, 3, 4) != 0]
+    if not candidats:
+        return mot
+    return str(lexique.lemme(plus_proche(mot, candidats)[0]))
+
+
+def correction_prefixes(mot, lexique):
+    """Candidats de l'index des préfixes seulement (mêmes candidats que le parcours)."""
+    if mot in lexique:
+        return str(lexique.lemme(mot))
+    candidats = [lexique.formes[rang] for rang in lexique.prefixes.candidats(mot, 3, 4)]
+    if not candidats:
+        return mot
+    return str(lexique.lemme(plus_proche(mot, candidats)[0]))
+
+
+def correction_ancienne(mot, lemmes_path):
+    """correction_orthographique d'origine : relit le fichier de lemmes à chaque appel."""
+    lemmes = pd.read_csv(lemmes_path, sep="\t")
+    if mot in lemmes["mot"].values:
+        return str(lemmes.loc[lemmes["mot"] == mot, "lemme"].values[0])
+    candidats = [forme for forme in lemmes["mot"] if recherche_proximite(mot, forme, 3, 4) != 0]
+    if not candidats:
+        return mot
+    return str(lemmes.loc[lemmes["mot"] == plus_proche(mot, candidats)[0], "lemme"].values[0])
+
+
+def charger_spellcorrector(chemin_code, chemin_lexique):
+    """SpellCorrector de Code_loic/td5.py, chargé sous un autre nom que le td5 du TD7."""
+    import importlib.util
+    dossier = Path(chemin_code).resolve().parent
+    sys.path.insert(0, str(dossier))
+    spec = importlib.util.spec_from_file_location("td5_code_loic", chemin_code)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.SpellCorrector(Path("absent.tsv"), Path(chemin_lexique))
+
+
+# -----------------------------------------------------
+# Mesures
+# -----------------------------------------------------
+def mesurer(corriger, echantillon, attendu):
+    """
+    Latence (s) et justesse de chaque correction de l'échantillon. attendu(mot)
+    donne le lemme attendu pour le mot d'origine, dans le lexique de la
+    méthode (None : mot absent de ce lexique, justesse non comptée -> nan).
+    """
+    latences, justes = [], []
+    for mot, fautif, _, _ in echantillon:
+        debut = time.perf_counter()
+        corrige = corriger(fautif)
+        latences.append(time.perf_counter() - debut)
+        lemme = attendu(mot)
+        justes.append(np.nan if lemme is None else float(corrige == lemme))
+    return np.array(latences), np.array(justes)
+
+
+def resumer(nom, groupe, latences, justes):
+    return {
+        "methode": nom,
+        "groupe": groupe,
+        "n": len(latences),
+        "mots_par_s": len(latences) / latences.sum() if latences.sum() > 0 else float("inf"),
+        "p50_us": np.percentile(latences, 50) * 1e6,
+        "p95_us": np.percentile(latences, 95) * 1e6,
+        "p99_us": np.percentile(latences, 99) * 1e6,
+        "justesse": np.nanmean(justes) if not np.isnan(justes).all() else np.nan,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Débit, latence et justesse des méthodes de correction orthographique.")
+    parser.add_argument("--lexique", default="lemmes_lower.csv")
+    parser.add_argument("-n", type=int, default=500, help="nombre de mots fautifs")
+    parser.add_argument("--distance-max", type=int, default=2, help="nombre maximal de fautes par mot")
+    parser.add_argument("--types", default=",".join(TYPES_FAUTES), help="types de fautes, séparés par des virgules")
+    parser.add_argument("--methodes", default="parcours,prefixes,symspell,complete,cache",
+                        help="parmi ancienne (lente : relit le lexique à chaque mot), parcours, "
+                             "prefixes, symspell, complete, cache, spellcorrector")
+    parser.add_argument("--spellcorrector", default=None,
+                        help="lexique sérialisé (td5_lexicon.bin) du SpellCorrector de Code_loic à mesurer aussi")
+    parser.add_argument("--code-loic", default="../Code_loic/td5.py")
+    parser.add_argument("--rejeux", type=int, default=2,
+                        help="passages de l'échantillon pour la méthode cache (les suivants mesurent les succès du cache)")
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--csv", default=None, help="écrit aussi les résultats dans ce fichier")
+    args = parser.parse_args()
+
+    lexique = Lexique.charger(args.lexique)
+    rng = random.Random(args.graine)
+    echantillon = generer_fautes(lexique.formes, args.n, args.distance_max, args.types.split(","), rng)
+
+    methodes = {
+        "ancienne": lambda mot: correction_ancienne(mot, args.lexique),
+        "parcours": lambda mot: correction_parcours(mot, lexique),
+        "prefixes": lambda mot: correction_prefixes(mot, lexique),
+        "symspell": lambda mot: corriger_sans_table(mot, lexique),
+        "complete": lambda mot: _corriger(mot, lexique),
+        "cache": lambda mot: correction_orthographique(mot, lexique),
+    }
+    # Lemme attendu de chaque mot d'origine, dans le lexique utilisé par la méthode
+    attendus = dict.fromkeys(methodes, lambda mot: str(lexique.lemme(mot)))
+    # Échantillon rejoué : les mots déjà corrigés sont servis par le cache
+    rejeux = {"cache": args.rejeux}
+    if args.spellcorrector:
+        with contextlib.redirect_stdout(io.StringIO()):
+            correcteur = charger_spellcorrector(args.code_loic, args.spellcorrector)
+        methodes["spellcorrector"] = lambda mot: correcteur.correct_word(mot)[0]
+        attendus["spellcorrector"] = correcteur.word_to_lemma.get
+
+    lignes = []
+    for nom in args.methodes.split(","):
+        if nom not in methodes:
+            print(f"méthode inconnue ou indisponible : {nom}")
+            continue
+        passages = rejeux.get(nom, 1)
+        with contextlib.redirect_stdout(io.StringIO()):  # messages "no lemma found"
+            latences, justes = mesurer(methodes[nom], echantillon * passages, attendus[nom])
+        lignes.append(resumer(nom, "tous", latences, justes))
+        if passages > 1:
+            premier = np.arange(len(latences)) < len(echantillon)
+            lignes.append(resumer(nom, "1er passage", latences[premier], justes[premier]))
+            lignes.append(resumer(nom, "rejeux", latences[~premier], justes[~premier]))
+        distances = np.array([d for _, _, d, _ in echantillon] * passages)
+        for d in sorted(set(distances)):
+            lignes.append(resumer(nom, f"{d} faute(s)", latences[distances == d], justes[distances == d]))
+        types = np.array([t for _, _, _, t in echantillon] * passages)
+        for t in TYPES_FAUTES:
+            masque = types == t
+            if masque.any():
+                lignes.append(resumer(nom, t, latences[masque], justes[masque]))
+
+    print(f"{len(echantillon)} mots fautifs (graine {args.graine})\n")
+    print(f"{'méthode':<15} {'groupe':<14} {'n':>5} {'mots/s':>10} {'p50 µs':>9} {'p95 µs':>9} {'p99 µs':>9} {'justesse':>9}")
+    for ligne in lignes:
+        print(f"{ligne['methode']:<15} {ligne['groupe']:<14} {ligne['n']:>5} {ligne['mots_par_s']:>10.0f} "
+              f"{ligne['p50_us']:>9.1f} {ligne['p95_us']:>9.1f} {ligne['p99_us']:>9.1f} {ligne['justesse']:>9.1%}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(lignes[0]), delimiter="\t")
+            writer.writeheader()
+            writer.writerows(lignes)
@@ -0,0 +1,82 @@
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from distance import distance, distance_bornee, distances
+
+
+# -----------------------------------------------------
+# Implémentations de référence (versions précédentes)
+# -----------------------------------------------------
+def distance_numpy(word, candidate):
+    """Matrice numpy complète remplie case par case (ancien td5.levenshtein)."""
+    lw, lc = len(word), len(candidate)
+    dist = np.zeros((lw + 1, lc + 1), dtype=int)
+    for i in range(lw + 1):
+        dist[i][0] = i
+    for j in range(lc + 1):
+        dist[0][j] = j
+    for i in range(1, lw + 1):
+        for j in range(1, lc + 1):
+            cost = 0 if word[i - 1] == candidate[j - 1] else 1
+            dist[i][j] = min(dist[i - 1][j] + 1, dist[i][j - 1] + 1, dist[i - 1][j - 1] + cost)
+    return dist[lw][lc]
+
+
+def distance_listes(s1, s2):
+    """Programmation dynamique ligne par ligne sur des listes (SpellCorrector._levenshtein_distance)."""
+    if len(s1) < len(s2):
+        return distance_listes(s2, s1)
+    if len(s2) == 0:
+        return len(s1)
+    previous_row = range(len(s2) + 1)
+    for i, c1 in enumerate(s1):
+        current_row = [i + 1]
+        for j, c2 in enumerate(s2):
+            current_row.append(min(previous_row[j + 1] + 1, current_row[j] + 1, previous_row[j] + (c1 != c2)))
+        previous_row = current_row
+    return previous_row[-1]
+
+
+# -----------------------------------------------------
+# Micro-benchmark
+# -----------------------------------------------------
+def mesurer(nom, fonction, paires, reference=None):
+    debut = time.perf_counter()
+    resultats = fonction(paires)
+    duree = time.perf_counter() - debut
+    print(f"{nom:<28} {duree * 1e6 / len(paires):8.2f} µs / paire   ({duree:.3f} s)")
+    if reference is not None:
+        assert resultats == reference, nom
+    return resultats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare les implémentations de la distance de Levenshtein.")
+    parser.add_argument("--lexique", default="lemmes_lower.csv")
+    parser.add_argument("--mots", type=int, default=50, help="nombre de mots requêtes")
+    parser.add_argument("--candidats", type=int, default=200, help="candidats par mot")
+    parser.add_argument("--distance-max", type=int, default=2)
+    parser.add_argument("--graine", type=int, default=0)
+    args = parser.parse_args()
+
+    formes = pd.read_csv(args.lexique, sep="\t")["mot"].astype(str).unique().tolist()
+    random.seed(args.graine)
+    requetes = random.sample(formes, args.mots)
+    lots = [(mot, random.sample(formes, args.candidats)) for mot in requetes]
+    paires = [(mot, c) for mot, candidats in lots for c in candidats]
+    k = args.distance_max
+    print(f"{len(paires)} paires, distance_max = {k}\n")
+
+    reference = mesurer("numpy (ancien td5)", lambda p: [int(distance_numpy(a, b)) for a, b in p], paires)
+    mesurer("listes (SpellCorrector)", lambda p: [distance_listes(a, b) for a, b in p], paires, reference)
+    mesurer("Myers bit-parallèle", lambda p: [distance(a, b) for a, b in p], paires, reference)
+
+    bornee = [min(d, k + 1) for d in reference]
+    mesurer(f"Myers, arrêt à {k}", lambda p: [distance(a, b, k) for a, b in p], paires, bornee)
+    mesurer(f"bande diagonale, arrêt à {k}", lambda p: [distance_bornee(a, b, k) for a, b in p], paires, bornee)
+    mesurer(f"lot distances(), arrêt à {k}",
+            lambda p: [d for mot, candidats in lots for d in distances(mot, candidats, k)], paires, bornee)
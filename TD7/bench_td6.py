@@ -0,0 +1,199 @@
+import argparse
+import contextlib
+import csv
+import io
+import json
+import random
+import sys
+import time
+
+import td6
+from parite_td6 import comparer
+
+
+# -----------------------------------------------------
+# Corpus de requêtes
+# -----------------------------------------------------
+def charger_requetes(chemin):
+    with open(chemin, encoding="utf-8") as f:
+        return [ligne.strip() for ligne in f if ligne.strip()]
+
+
+def variante(requete, rng):
+    """Requête de même sens : casse, ponctuation finale et formule de politesse tirées au hasard."""
+    if rng.random() < 0.5:
+        requete = requete.lower()
+    elif rng.random() < 0.5:
+        requete = requete[0].upper() + requete[1:]
+    requete = requete.rstrip(" ?.") + rng.choice(["", ".", " ?", "?"])
+    if rng.random() < 0.3:
+        requete = rng.choice(["Bonjour, ", "S'il vous plaît, ", "Merci : "]) + requete
+    return requete
+
+
+def generer_variantes(requetes, nombre, rng):
+    """Les requêtes d'origine suivies de nombre variantes de chacune."""
+    return requetes + [variante(requete, rng) for _ in range(nombre) for requete in requetes]
+
+
+# -----------------------------------------------------
+# Mesures
+# -----------------------------------------------------
+# Étapes de traiter_requete : fonction de td6 chronométrée -> nom de l'étape
+ETAPES = {
+    "identifie_return": "return",
+    "identifie_image": "images",
+    "identifie_rubrique": "rubrique",
+    "supprimer_mots": "articles",
+    "identifie_titres": "titre",
+    "identifie_dates": "dates",
+    "identifie_mots_cles": "mots-clés",
+}
+
+# Champ du résultat -> étape qui le produit (pour situer une différence)
+CHAMPS = {
+    "return": "return", "images": "images",
+    "rubrique": "rubrique", "operateurs_rubrique": "rubrique",
+    "titre": "titre", "operateurs_titre": "titre",
+    "dates": "dates",
+    "mots_cles": "mots-clés", "operateurs_mots_cles": "mots-clés",
+}
+
+
+def analyser(requete):
+    """Analyse complète, sans le cache de traiter_requete."""
+    return td6.analyser_requete(td6.normaliser_requete(requete))
+
+
+def debit(requetes, repetitions, analyse=analyser):
+    """Nombre de requêtes analysées par seconde (sans instrumentation)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        debut = time.perf_counter()
+        for _ in range(repetitions):
+            for requete in requetes:
+                analyse(requete)
+        duree = time.perf_counter() - debut
+    return repetitions * len(requetes) / duree
+
+
+@contextlib.contextmanager
+def chronometres(durees):
+    """Remplace les étapes de td6 par des versions qui cumulent leur durée dans durees."""
+    originales = {nom: getattr(td6, nom) for nom in ETAPES}
+
+    def chronometree(nom, fonction):
+        def etape(*args):
+            debut = time.perf_counter()
+            try:
+                return fonction(*args)
+            finally:
+                durees[ETAPES[nom]] += time.perf_counter() - debut
+        return etape
+
+    for nom, fonction in originales.items():
+        setattr(td6, nom, chronometree(nom, fonction))
+    try:
+        yield durees
+    finally:
+        for nom, fonction in originales.items():
+            setattr(td6, nom, fonction)
+
+
+def durees_par_etape(requetes, repetitions):
+    """Durée cumulée (s) de chaque étape, et de l'analyse complète ("total")."""
+    durees = dict.fromkeys(list(ETAPES.values()) + ["total"], 0.0)
+    with chronometres(durees), contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repetitions):
+            for requete in requetes:
+                debut = time.perf_counter()
+                analyser(requete)
+                durees["total"] += time.perf_counter() - debut
+    durees["autres"] = durees["total"] - sum(durees[etape] for etape in ETAPES.values())
+    return durees
+
+
+# -----------------------------------------------------
+# Comparaison aux résultats de référence
+# -----------------------------------------------------
+def etapes_differentes(attendu, obtenu):
+    return sorted({CHAMPS.get(champ, champ) for champ in set(attendu) | set(obtenu)
+                   if attendu.get(champ) != obtenu.get(champ)})
+
+
+def ecrire_golden(requetes, chemin):
+    with contextlib.redirect_stdout(io.StringIO()):
+        references = [{"requete": requete, "resultat": td6.degeler(td6.traiter_requete(requete))}
+                      for requete in requetes]
+    with open(chemin, "w", encoding="utf-8") as f:
+        json.dump(references, f, ensure_ascii=False, indent=1)
+
+
+# Sorties d'étapes enregistrées dans TD6 (une ligne par requête) encore comparables
+DUMPS_TD6 = {
+    "results_return.txt": lambda resultat: str(resultat["return"]),
+    "results_images.txt": lambda resultat: str(bool(resultat["images"])),
+}
+
+
+def comparer_dumps(requetes, dossier):
+    """Nombre de requêtes différentes pour chaque sortie d'étape de DUMPS_TD6."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultats = [td6.traiter_requete(requete) for requete in requetes]
+    differences = {}
+    for nom, extraire in DUMPS_TD6.items():
+        with open(f"{dossier}/{nom}", encoding="utf-8") as f:
+            attendus = f.read().split("\n")
+        differences[nom] = sum(extraire(resultat) != attendu for resultat, attendu in zip(resultats, attendus))
+    return differences
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Débit, durée par étape et non-régression de traiter_requete.")
+    parser.add_argument("--requetes", default="../TD6/requetes_as_they_are.txt")
+    parser.add_argument("--golden", default="requetes_golden.json")
+    parser.add_argument("--ecrire-golden", action="store_true",
+                        help="réécrit les résultats de référence avec l'analyseur actuel (changement voulu)")
+    parser.add_argument("--variantes", type=int, default=0, help="nombre de variantes synthétiques par requête")
+    parser.add_argument("--repetitions", type=int, default=20)
+    parser.add_argument("--graine", type=int, default=0)
+    parser.add_argument("--csv", default=None, help="écrit aussi les durées par étape dans ce fichier")
+    args = parser.parse_args()
+
+    requetes = charger_requetes(args.requetes)
+    if args.ecrire_golden:
+        ecrire_golden(requetes, args.golden)
+        print(f"{len(requetes)} résultats de référence écrits dans {args.golden}")
+    corpus = generer_variantes(requetes, args.variantes, random.Random(args.graine))
+
+    requetes_par_s = debit(corpus, args.repetitions)
+    td6.cache_analyses.vider()
+    requetes_par_s_cache = debit(corpus, args.repetitions, td6.traiter_requete)
+    durees = durees_par_etape(corpus, args.repetitions)
+    n = args.repetitions * len(corpus)
+
+    print(f"{len(corpus)} requêtes ({len(requetes)} d'origine, {args.variantes} variante(s) chacune), "
+          f"{args.repetitions} répétitions")
+    print(f"débit : {requetes_par_s:.0f} requêtes/s ({1e6 / requetes_par_s:.1f} µs par requête)")
+    print(f"débit avec le cache d'analyses : {requetes_par_s_cache:.0f} requêtes/s "
+          f"({1e6 / requetes_par_s_cache:.1f} µs par requête)\n")
+    lignes = [{"etape": etape, "us_par_requete": duree / n * 1e6, "part": duree / durees["total"]}
+              for etape, duree in durees.items()]
+    print(f"{'étape':<10} {'µs/requête':>11} {'part':>7}")
+    for ligne in lignes:
+        print(f"{ligne['etape']:<10} {ligne['us_par_requete']:>11.2f} {ligne['part']:>7.1%}")
+
+    references, differences = comparer(args.golden)
+    print(f"\nréférence {args.golden} : {len(references) - len(differences)}/{len(references)} identiques")
+    for requete, attendu, obtenu in differences:
+        print(f"  [{', '.join(etapes_differentes(attendu, obtenu))}] {requete}")
+    dossier_td6 = args.requetes.rsplit("/", 1)[0] if "/" in args.requetes else "."
+    for nom, nombre in comparer_dumps(requetes, dossier_td6).items():
+        print(f"sortie d'étape {nom} : {len(requetes) - nombre}/{len(requetes)} identiques")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(lignes[0]), delimiter="\t")
+            writer.writeheader()
+            writer.writerows(lignes)
+
+    sys.exit(1 if differences else 0)
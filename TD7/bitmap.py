@@ -0,0 +1,126 @@
+import numpy as np
+
+from normalisation import plier, regrouper_par_cle
+
+
+# -----------------------------------------------------
+# Dictionnaire des documents : identifiant de bulletin -> entier dense
+# -----------------------------------------------------
+class DictionnaireDocs:
+    """
+    Associe à chaque bulletin (ex: 67068) un entier dense 0..n-1.
+
+    Les entiers sont attribués dans l'ordre croissant des identifiants :
+    la conversion d'un tableau trié de bulletins en entiers denses est donc
+    une simple recherche dichotomique vectorisée (np.searchsorted).
+    """
+
+    def __init__(self, bulletins):
+        self.bulletins = np.unique(np.asarray(bulletins, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.bulletins)
+
+    def vers_denses(self, postings):
+        """Convertit des identifiants de bulletins en entiers denses (les inconnus sont ignorés)."""
+        postings = np.asarray(postings, dtype=np.int32)
+        rangs = np.searchsorted(self.bulletins, postings)
+        connus = rangs < len(self.bulletins)
+        connus[connus] = self.bulletins[rangs[connus]] == postings[connus]
+        return rangs[connus]
+
+    def vers_bulletins(self, denses):
+        """Convertit des entiers denses en identifiants de bulletins."""
+        return self.bulletins[denses]
+
+
+# -----------------------------------------------------
+# Bitmaps : un bit par document, compactés avec np.packbits
+# -----------------------------------------------------
+def bitmap_depuis_denses(denses, n):
+    """Construit le bitmap (n bits) des documents d'entiers denses donnés."""
+    bits = np.zeros(n, dtype=bool)
+    bits[denses] = True
+    return np.packbits(bits)
+
+
+def bitmap_vide(n):
+    return np.zeros((n + 7) // 8, dtype=np.uint8)
+
+
+def bitmap_plein(n):
+    return np.packbits(np.ones(n, dtype=bool))
+
+
+def bitmap_et(*bitmaps):
+    return np.bitwise_and.reduce(bitmaps)
+
+
+def bitmap_ou(*bitmaps):
+    return np.bitwise_or.reduce(bitmaps)
+
+
+def bitmap_sauf(bitmap, exclus):
+    """Documents de bitmap qui ne sont pas dans exclus (ET NON)."""
+    return bitmap & ~exclus
+
+
+def cardinalite(bitmap):
+    return int(np.unpackbits(bitmap).sum())
+
+
+def denses_depuis_bitmap(bitmap, n):
+    """Entiers denses (triés) des documents présents dans le bitmap."""
+    return np.flatnonzero(np.unpackbits(bitmap, count=n))
+
+
+class IndexBitmaps:
+    """
+    Vue d'un index inversé (dict ou IndexBinaire) sous forme de bitmaps.
+
+    Le bitmap d'un terme est construit à la première demande puis conservé :
+    les requêtes suivantes sur ce terme ne font plus que des opérations
+    vectorisées sur des tableaux d'octets.
+    """
+
+    def __init__(self, index, dictionnaire):
+        self.index = index
+        self.dictionnaire = dictionnaire
+        self._bitmaps = {}
+        self._termes_par_cle = None
+
+    def __contains__(self, terme):
+        return terme in self._bitmaps or terme in self.index
+
+    def get(self, terme):
+        """Bitmap des documents contenant le terme, ou None si le terme est absent."""
+        bitmap = self._bitmaps.get(terme)
+        if bitmap is None:
+            postings = self.index.get(terme)
+            if postings is None:
+                return None
+            bitmap = bitmap_depuis_denses(self.dictionnaire.vers_denses(postings), len(self.dictionnaire))
+            self._bitmaps[terme] = bitmap
+        return bitmap
+
+    def taille(self, terme):
+        """Nombre de documents du terme (0 s'il est absent), sans construire son bitmap."""
+        if hasattr(self.index, "frequence"):
+            return self.index.frequence(terme)
+        postings = self.index.get(terme)
+        return 0 if postings is None else len(postings)
+
+    def termes(self):
+        return list(self.index.keys())
+
+    def variantes(self, terme):
+        """
+        Termes de l'index qui correspondent à terme : lui-même s'il est présent,
+        sinon les termes qui n'en diffèrent que par les accents ou la casse
+        (ex: "systemes" -> ["systèmes"]), sinon [].
+        """
+        if terme in self:
+            return [terme]
+        if self._termes_par_cle is None:
+            self._termes_par_cle = regrouper_par_cle(sorted(self.termes()))
+        return self._termes_par_cle.get(plier(terme), [])
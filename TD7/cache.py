@@ -0,0 +1,58 @@
+import time
+from collections import OrderedDict
+
+
+# -----------------------------------------------------
+# Cache LRU borné, avec durée de vie optionnelle
+# -----------------------------------------------------
+class CacheLRU:
+    """
+    Cache de taille bornée : quand il est plein, l'entrée utilisée le moins
+    récemment est supprimée. Si ttl (en secondes) est donné, une entrée plus
+    ancienne que ttl est considérée comme absente.
+
+    Les compteurs de succès / échecs sont disponibles via statistiques().
+    """
+
+    ABSENT = object()
+
+    def __init__(self, taille_max=1024, ttl=None):
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self._entrees = OrderedDict()  # cle -> (instant d'insertion, valeur)
+        self.succes = 0
+        self.echecs = 0
+
+    def __len__(self):
+        return len(self._entrees)
+
+    def get(self, cle, defaut=None):
+        """Valeur associée à cle (et la marque comme récemment utilisée), sinon defaut."""
+        entree = self._entrees.get(cle)
+        if entree is not None and (self.ttl is None or time.monotonic() - entree[0] <= self.ttl):
+            self._entrees.move_to_end(cle)
+            self.succes += 1
+            return entree[1]
+        if entree is not None:
+            del self._entrees[cle]  # entrée expirée
+        self.echecs += 1
+        return defaut
+
+    def put(self, cle, valeur):
+        self._entrees[cle] = (time.monotonic(), valeur)
+        self._entrees.move_to_end(cle)
+        while len(self._entrees) > self.taille_max:
+            self._entrees.popitem(last=False)
+
+    def vider(self):
+        self._entrees.clear()
+
+    def statistiques(self):
+        """Nombre d'entrées, de succès, d'échecs et taux de succès du cache."""
+        total = self.succes + self.echecs
+        return {
+            "entrees": len(self._entrees),
+            "succes": self.succes,
+            "echecs": self.echecs,
+            "taux_succes": self.succes / total if total else 0.0,
+        }
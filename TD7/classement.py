@@ -0,0 +1,123 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------------------------------
+# Classement des documents par BM25
+# -----------------------------------------------------
+class IndexBM25:
+    """
+    Index de classement BM25 construit à partir des fréquences du TD3
+    (fichier tf.csv produit par calculate_coeff : colonnes mot, doc_id, tf).
+
+    Pour chaque terme on garde les documents triés et le score BM25 de chaque
+    couple (terme, document), calculé une fois au chargement. Le score
+    maximal de chaque terme sert de borne supérieure à l'algorithme MaxScore :
+    les documents qui ne peuvent plus entrer dans le top-k ne sont pas évalués.
+    """
+
+    def __init__(self, chemin_tf, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+
+        df = pd.read_csv(chemin_tf, sep="\t", keep_default_na=False, dtype={"mot": str})
+        # Quelques lignes du TD3 ont un doc_id mal segmenté (ex: " 12 j") : on les ignore
+        df["doc_id"] = pd.to_numeric(df["doc_id"], errors="coerce")
+        df = df.dropna(subset=["doc_id"]).astype({"doc_id": np.int32})
+        df = df.groupby(["mot", "doc_id"], as_index=False)["tf"].sum()
+
+        # Longueur de chaque document = somme des occurrences de ses termes
+        longueurs = df.groupby("doc_id")["tf"].sum()
+        self.n_docs = len(longueurs)
+        longueur_moyenne = longueurs.mean()
+        longueur_doc = df["doc_id"].map(longueurs).to_numpy(dtype=np.float64)
+
+        # Nombre de documents par terme et IDF (variante BM25, toujours positive)
+        dft = df.groupby("mot")["doc_id"].transform("size").to_numpy(dtype=np.float64)
+        idf = np.log(1 + (self.n_docs - dft + 0.5) / (dft + 0.5))
+
+        tf = df["tf"].to_numpy(dtype=np.float64)
+        scores = idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * longueur_doc / longueur_moyenne))
+
+        # df est trié par (mot, doc_id) : les postings de chaque terme sont contigus et triés
+        self.postings = {}
+        docs = df["doc_id"].to_numpy(dtype=np.int32)
+        debut = 0
+        for mot, taille in df.groupby("mot", sort=False).size().items():
+            fin = debut + taille
+            self.postings[mot] = (docs[debut:fin], scores[debut:fin], float(scores[debut:fin].max()))
+            debut = fin
+
+    def __contains__(self, terme):
+        return terme in self.postings
+
+    def top_k(self, termes, k=10, filtre=None):
+        """
+        Renvoie les k documents de meilleur score BM25 pour les termes donnés,
+        sous forme de liste [(doc, score)] triée par score décroissant.
+
+        filtre : ensemble optionnel de documents autorisés (filtres booléens
+        de la requête : rubrique, dates, images...), appliqué avant le calcul du score.
+        """
+        listes = [self.postings[t] for t in dict.fromkeys(termes) if t in self.postings]
+        if not listes or k <= 0:
+            return []
+
+        # MaxScore : termes triés par borne croissante, bornes cumulées
+        listes.sort(key=lambda liste: liste[2])
+        bornes_cumulees = np.cumsum([liste[2] for liste in listes])
+        curseurs = [0] * len(listes)
+
+        tas = []  # tas min des (score, doc) du top-k courant
+        seuil = 0.0
+        premier_essentiel = 0  # les termes avant cet indice ne suffisent pas à dépasser le seuil
+
+        while True:
+            # Prochain document candidat : le plus petit parmi les termes essentiels
+            doc = None
+            for i in range(premier_essentiel, len(listes)):
+                docs_i = listes[i][0]
+                if curseurs[i] < len(docs_i) and (doc is None or docs_i[curseurs[i]] < doc):
+                    doc = docs_i[curseurs[i]]
+            if doc is None:
+                break
+
+            if filtre is not None and int(doc) not in filtre:
+                # Document exclu par les filtres : on passe ses postings sans calculer de score
+                for i in range(premier_essentiel, len(listes)):
+                    docs_i = listes[i][0]
+                    if curseurs[i] < len(docs_i) and docs_i[curseurs[i]] == doc:
+                        curseurs[i] += 1
+                continue
+
+            score = 0.0
+            for i in range(premier_essentiel, len(listes)):
+                docs_i, scores_i, _ = listes[i]
+                if curseurs[i] < len(docs_i) and docs_i[curseurs[i]] == doc:
+                    score += scores_i[curseurs[i]]
+                    curseurs[i] += 1
+
+            # Termes non essentiels : évalués seulement si le document peut encore entrer dans le top-k
+            for i in range(premier_essentiel - 1, -1, -1):
+                if score + bornes_cumulees[i] <= seuil:
+                    break
+                docs_i, scores_i, _ = listes[i]
+                j = curseurs[i] = curseurs[i] + int(np.searchsorted(docs_i[curseurs[i]:], doc))
+                if j < len(docs_i) and docs_i[j] == doc:
+                    score += scores_i[j]
+
+            if len(tas) < k:
+                heapq.heappush(tas, (score, int(doc)))
+            elif score > tas[0][0]:
+                heapq.heapreplace(tas, (score, int(doc)))
+            else:
+                continue
+
+            if len(tas) == k:
+                seuil = tas[0][0]
+                while premier_essentiel < len(listes) and bornes_cumulees[premier_essentiel] <= seuil:
+                    premier_essentiel += 1
+
+        return [(str(doc), float(score)) for score, doc in sorted(tas, key=lambda x: (-x[0], x[1]))]
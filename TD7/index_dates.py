@@ -0,0 +1,136 @@
+import numpy as np
+
+
+def date_en_entier(date):
+    """Convertit une date 'j/m/a' du corpus en entier aaaammjj (ex: '21/06/2011' -> 20110621)."""
+    jour, mois, annee = map(int, date.split("/"))
+    return annee * 10000 + mois * 100 + jour
+
+
+def composantes(date_requete):
+    """Année, mois et jour (entiers ou None) d'une date de requête {"j", "m", "a"}."""
+    return tuple(int(date_requete[k]) if date_requete.get(k) is not None else None for k in ["a", "m", "j"])
+
+
+class IndexDates:
+    """
+    Index des dates de publication, aligné sur les identifiants denses des documents.
+
+    - date_par_doc[i] : date aaaammjj du document dense i (0 si inconnue)
+    - ordre           : documents denses triés par date
+    - dates_triees    : date_par_doc[ordre], trié, pour les recherches dichotomiques
+
+    Les intervalles début/fin dont l'année est connue se résolvent par
+    recherche dichotomique (O(log n + k)) ; "précis", "not" et les bornes
+    sans année s'appliquent sous forme de masques vectorisés. La sémantique
+    est celle de compare_dates : seules les composantes précisées comptent.
+    """
+
+    def __init__(self, index_date, dictionnaire):
+        self.n = len(dictionnaire)
+        self.date_par_doc = np.zeros(self.n, dtype=np.int32)
+        for date, docs in index_date.items():
+            self.date_par_doc[dictionnaire.vers_denses(docs)] = date_en_entier(date)
+        self.ordre = np.argsort(self.date_par_doc, kind="stable")
+        self.dates_triees = self.date_par_doc[self.ordre]
+        self.valides = self.date_par_doc > 0
+
+        self.annees = self.date_par_doc // 10000
+        self.mois = self.date_par_doc // 100 % 100
+        self.jours = self.date_par_doc % 100
+
+    # -------------------------------------------------
+    # Masques vectorisés
+    # -------------------------------------------------
+    def _egal(self, date_requete):
+        """Documents dont chaque composante précisée est égale à celle de la requête."""
+        masque = self.valides.copy()
+        for valeur, champ in zip(composantes(date_requete), [self.annees, self.mois, self.jours]):
+            if valeur is not None:
+                masque &= champ == valeur
+        return masque
+
+    def _comparer(self, date_requete):
+        """Version vectorisée de compare_date_components : -1, 0 ou 1 pour chaque document."""
+        cmp = np.zeros(self.n, dtype=np.int8)
+        for valeur, champ in zip(composantes(date_requete), [self.annees, self.mois, self.jours]):
+            if valeur is not None:
+                indecis = cmp == 0
+                cmp[indecis] = np.sign(champ[indecis] - valeur)
+        return cmp
+
+    # -------------------------------------------------
+    # Bornes par recherche dichotomique
+    # -------------------------------------------------
+    @staticmethod
+    def _bornes(date_requete):
+        """
+        Intervalle [min, max] des dates aaaammjj qui valent "égal" à une date
+        partielle dont l'année est connue (ex: juin 2012 -> [20120600, 20120699]).
+        Renvoie None si l'année n'est pas précisée (l'ordre n'est alors plus lexicographique).
+        """
+        annee, mois, jour = composantes(date_requete)
+        if annee is None or (mois is None and jour is not None):
+            return None
+        if mois is None:
+            return annee * 10000, annee * 10000 + 9999
+        if jour is None:
+            return annee * 10000 + mois * 100, annee * 10000 + mois * 100 + 99
+        return (annee * 10000 + mois * 100 + jour,) * 2
+
+    def _masque_intervalle(self, debut, fin):
+        """Masque des documents dont la date est dans [debut, fin] (recherche dichotomique)."""
+        gauche = np.searchsorted(self.dates_triees, max(debut, 1), side="left")
+        droite = np.searchsorted(self.dates_triees, fin, side="right")
+        masque = np.zeros(self.n, dtype=bool)
+        masque[self.ordre[gauche:droite]] = True
+        return masque
+
+    def estimer(self, date_requete):
+        """
+        Estimation (majorant) du nombre de documents retenus par les critères de date,
+        calculée par recherche dichotomique quand l'année est connue, sans construire de masque.
+        """
+        precis = date_requete.get("précis")
+        if precis is not None:
+            bornes = self._bornes(precis)
+        else:
+            debut, fin = date_requete.get("début"), date_requete.get("fin")
+            bornes_debut = self._bornes(debut) if debut is not None else (0, 0)
+            bornes_fin = self._bornes(fin) if fin is not None else (99999999, 99999999)
+            bornes = None if bornes_debut is None or bornes_fin is None else (bornes_debut[0], bornes_fin[1])
+        if bornes is None:
+            return int(self.valides.sum())
+        gauche = np.searchsorted(self.dates_triees, max(bornes[0], 1), side="left")
+        droite = np.searchsorted(self.dates_triees, bornes[1], side="right")
+        return int(max(droite - gauche, 0))
+
+    def filtrer(self, date_requete):
+        """
+        Masque booléen (sur les documents denses) des documents compatibles
+        avec les critères de date de la requête ("début", "fin", "précis", "not").
+        """
+        masque = self.valides.copy()
+
+        not_req = date_requete.get("not")
+        if not_req is not None:
+            masque &= ~self._egal(not_req)
+
+        precis = date_requete.get("précis")
+        if precis is not None:
+            bornes = self._bornes(precis)
+            if bornes is not None:
+                return masque & self._masque_intervalle(*bornes)
+            return masque & self._egal(precis)
+
+        debut, fin = date_requete.get("début"), date_requete.get("fin")
+        bornes_debut = self._bornes(debut) if debut is not None else (0, 0)
+        bornes_fin = self._bornes(fin) if fin is not None else (99999999, 99999999)
+        if bornes_debut is not None and bornes_fin is not None:
+            masque &= self._masque_intervalle(bornes_debut[0], bornes_fin[1])
+        else:
+            if debut is not None:
+                masque &= self._comparer(debut) >= 0
+            if fin is not None:
+                masque &= self._comparer(fin) <= 0
+        return masque
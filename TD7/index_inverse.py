@@ -0,0 +1,323 @@
+import ast
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------------------------------
+# Lecture des index inversés CSV du TD4
+# -----------------------------------------------------
+def decoder_postings(docs):
+    """
+    Décode une liste de documents telle qu'écrite par le TD4
+    (ex: "['70161', '70161', '70163']") en tableau d'entiers trié et sans doublon.
+
+    Le format est toujours une liste de chaînes numériques : on extrait
+    directement les chiffres, sans passer par ast.literal_eval.
+    """
+    ids = [int(e.strip(" '\"")) for e in docs.strip("[] \n").split(",") if e.strip(" '\"")]
+    return np.unique(np.array(ids, dtype=np.int32))
+
+
+def charger_index(chemin):
+    """
+    Lit un index inversé du TD4 (colonnes "mot" et "docs") une seule fois
+    et le convertit en dictionnaire {terme: tableau trié des documents}.
+
+    Les postings sont décodés une fois pour toutes au chargement (entiers
+    triés, doublons supprimés) : aucune requête ne repasse par le parseur.
+    Les termes présents sur plusieurs lignes (rubriques mises en minuscules
+    à l'écriture, par exemple) voient leurs documents réunis.
+    """
+    df = pd.read_csv(chemin, sep="\t", keep_default_na=False, dtype=str)
+    index = {}
+    for mot, docs in zip(df["mot"], df["docs"]):
+        docs = decoder_postings(docs)
+        index[mot] = np.union1d(index[mot], docs) if mot in index else docs
+    return index
+
+
+def charger_positions(chemin):
+    """
+    Lit un index positionnel du TD4 (colonnes "mot" et "positions", où positions
+    est la représentation d'un dictionnaire {doc: [positions]}) et le convertit
+    en dictionnaire {terme: {doc (int): tableau trié des positions}}.
+    """
+    df = pd.read_csv(chemin, sep="\t", keep_default_na=False, dtype=str)
+    index = {}
+    for mot, positions in zip(df["mot"], df["positions"]):
+        docs = index.setdefault(mot, {})
+        for doc, pos in ast.literal_eval(positions).items():
+            docs[int(doc)] = np.unique(np.concatenate([docs.get(int(doc), []), pos]).astype(np.int32))
+    return index
+
+
+# -----------------------------------------------------
+# Compression des postings : deltas + varint
+# -----------------------------------------------------
+def encoder_varint(entiers):
+    """
+    Encode une liste d'entiers positifs en varint (7 bits par octet,
+    le bit de poids fort indique qu'un octet suit).
+    """
+    sortie = bytearray()
+    for n in entiers:
+        while n >= 0x80:
+            sortie.append((n & 0x7F) | 0x80)
+            n >>= 7
+        sortie.append(n)
+    return bytes(sortie)
+
+
+def decoder_varint(buffer, debut, fin):
+    """Décode les entiers varint contenus dans buffer[debut:fin]."""
+    entiers = []
+    n = decalage = 0
+    for octet in buffer[debut:fin]:
+        n |= (octet & 0x7F) << decalage
+        if octet & 0x80:
+            decalage += 7
+        else:
+            entiers.append(n)
+            n = decalage = 0
+    return entiers
+
+
+def encoder_postings(docs):
+    """Encode un tableau trié de documents en écarts successifs compressés en varint."""
+    docs = [int(d) for d in docs]
+    return encoder_varint([d - p for d, p in zip(docs, [0] + docs[:-1])])
+
+
+def decoder_postings_binaires(buffer, debut, fin):
+    """Inverse de encoder_postings : renvoie le tableau trié des documents."""
+    return np.cumsum(np.array(decoder_varint(buffer, debut, fin), dtype=np.int64)).astype(np.int32)
+
+
+def encoder_positions(docs, positions):
+    """
+    Encode les positions d'un terme, document par document dans l'ordre des
+    postings : nombre de positions puis écarts successifs, le tout en varint.
+    """
+    entiers = []
+    for doc in docs:
+        pos = [int(p) for p in positions.get(int(doc), [])]
+        entiers.append(len(pos))
+        entiers.extend(p - q for p, q in zip(pos, [0] + pos[:-1]))
+    return encoder_varint(entiers)
+
+
+def decoder_positions(docs, buffer, debut, fin):
+    """Inverse de encoder_positions : renvoie {doc: tableau trié des positions}."""
+    entiers = decoder_varint(buffer, debut, fin)
+    positions, i = {}, 0
+    for doc in docs.tolist():
+        n = entiers[i]
+        positions[doc] = np.cumsum(np.array(entiers[i + 1:i + 1 + n], dtype=np.int64)).astype(np.int32)
+        i += 1 + n
+    return positions
+
+
+# -----------------------------------------------------
+# Format binaire des index inversés
+# -----------------------------------------------------
+# En-tête : signature, version, options, nombre de termes, puis la position
+# dans le fichier de chaque section :
+#   - table des termes   : (n + 1) uint32, début de chaque terme dans le bloc des termes
+#   - bloc des termes    : termes UTF-8 concaténés, triés par octets
+#   - table des postings : (n + 1) uint64, début des postings de chaque terme
+#   - fréquences         : n uint32, nombre de documents de chaque terme
+#   - bloc des postings  : postings compressés (deltas + varint)
+# et, si l'option POSITIONS est active (index positionnel) :
+#   - table des positions : (n + 1) uint64, début des positions de chaque terme
+#   - bloc des positions  : positions compressées (voir encoder_positions)
+SIGNATURE = b"LO17IDX\x00"
+VERSION = 2
+ENTETE = struct.Struct("<8sHHIQQQQQQQ")
+POSITIONS = 1
+
+
+def ecrire_index_binaire(index, chemin, positions=None):
+    """
+    Écrit un index {terme: tableau trié des documents} au format binaire
+    (dictionnaire trié des termes, table des positions, postings compressés).
+    Si positions ({terme: {doc: positions}}) est fourni, l'index est positionnel.
+    """
+    termes = sorted((terme.encode("utf-8"), docs) for terme, docs in index.items())
+
+    bloc_termes = b"".join(t for t, _ in termes)
+    table_termes = np.zeros(len(termes) + 1, dtype="<u4")
+    table_termes[1:] = np.cumsum([len(t) for t, _ in termes])
+
+    postings = [encoder_postings(docs) for _, docs in termes]
+    bloc_postings = b"".join(postings)
+    table_postings = np.zeros(len(termes) + 1, dtype="<u8")
+    table_postings[1:] = np.cumsum([len(p) for p in postings])
+
+    frequences = np.array([len(docs) for _, docs in termes], dtype="<u4")
+
+    off_table_termes = ENTETE.size
+    off_termes = off_table_termes + table_termes.nbytes
+    off_table_postings = off_termes + len(bloc_termes)
+    off_table_postings += -off_table_postings % 8  # alignement pour la lecture en place
+    off_frequences = off_table_postings + table_postings.nbytes
+    off_postings = off_frequences + frequences.nbytes
+
+    options = off_table_positions = off_positions = 0
+    if positions is not None:
+        options |= POSITIONS
+        blocs_positions = [encoder_positions(docs, positions.get(t.decode("utf-8"), {})) for t, docs in termes]
+        table_positions = np.zeros(len(termes) + 1, dtype="<u8")
+        table_positions[1:] = np.cumsum([len(p) for p in blocs_positions])
+        off_table_positions = off_postings + len(bloc_postings)
+        off_table_positions += -off_table_positions % 8
+        off_positions = off_table_positions + table_positions.nbytes
+
+    with open(chemin, "wb") as f:
+        f.write(ENTETE.pack(SIGNATURE, VERSION, options, len(termes), off_table_termes, off_termes,
+                            off_table_postings, off_frequences, off_postings, off_table_positions, off_positions))
+        f.write(table_termes.tobytes())
+        f.write(bloc_termes)
+        f.write(b"\x00" * (off_table_postings - off_termes - len(bloc_termes)))
+        f.write(table_postings.tobytes())
+        f.write(frequences.tobytes())
+        f.write(bloc_postings)
+        if positions is not None:
+            f.write(b"\x00" * (off_table_positions - off_postings - len(bloc_postings)))
+            f.write(table_positions.tobytes())
+            f.write(b"".join(blocs_positions))
+
+
+class IndexBinaire:
+    """
+    Index inversé binaire ouvert par mmap.
+
+    L'ouverture ne lit que l'en-tête : les tables sont des vues NumPy sur le
+    fichier projeté en mémoire, et les postings d'un terme ne sont décodés
+    que lorsqu'une requête le demande. S'utilise comme un dictionnaire
+    {terme: tableau trié des documents} en lecture seule ; un index
+    positionnel donne aussi accès aux positions des termes (positions()).
+    """
+
+    def __init__(self, chemin):
+        with open(chemin, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (signature, version, self.options, self._n, off_table_termes, self._off_termes,
+         off_table_postings, off_frequences, self._off_postings,
+         off_table_positions, self._off_positions) = ENTETE.unpack_from(self._mm, 0)
+        if signature != SIGNATURE or version != VERSION:
+            raise ValueError(f"{chemin} n'est pas un index binaire LO17 (version {VERSION})")
+
+        self._table_termes = np.frombuffer(self._mm, dtype="<u4", count=self._n + 1, offset=off_table_termes)
+        self._table_postings = np.frombuffer(self._mm, dtype="<u8", count=self._n + 1, offset=off_table_postings)
+        self.frequences = np.frombuffer(self._mm, dtype="<u4", count=self._n, offset=off_frequences)
+        self.positionnel = bool(self.options & POSITIONS)
+        if self.positionnel:
+            self._table_positions = np.frombuffer(self._mm, dtype="<u8", count=self._n + 1,
+                                                  offset=off_table_positions)
+
+    def _terme(self, i):
+        debut = self._off_termes + int(self._table_termes[i])
+        return self._mm[debut:self._off_termes + int(self._table_termes[i + 1])]
+
+    def rang(self, terme):
+        """Position du terme dans le dictionnaire trié (recherche dichotomique), ou -1."""
+        cle = terme.encode("utf-8")
+        bas, haut = 0, self._n
+        while bas < haut:
+            milieu = (bas + haut) // 2
+            if self._terme(milieu) < cle:
+                bas = milieu + 1
+            else:
+                haut = milieu
+        if bas < self._n and self._terme(bas) == cle:
+            return bas
+        return -1
+
+    def postings(self, i):
+        """Décode les postings du terme de rang i."""
+        debut = self._off_postings + int(self._table_postings[i])
+        fin = self._off_postings + int(self._table_postings[i + 1])
+        return decoder_postings_binaires(self._mm, debut, fin)
+
+    def frequence(self, terme):
+        """Nombre de documents du terme (lu dans la table des fréquences, sans décoder les postings)."""
+        i = self.rang(terme)
+        return 0 if i == -1 else int(self.frequences[i])
+
+    def positions(self, terme):
+        """Positions du terme {doc: tableau trié des positions}, ou None (terme absent ou index non positionnel)."""
+        i = self.rang(terme)
+        if i == -1 or not self.positionnel:
+            return None
+        debut = self._off_positions + int(self._table_positions[i])
+        fin = self._off_positions + int(self._table_positions[i + 1])
+        return decoder_positions(self.postings(i), self._mm, debut, fin)
+
+    # Interface dictionnaire
+    def __len__(self):
+        return self._n
+
+    def __contains__(self, terme):
+        return self.rang(terme) != -1
+
+    def __getitem__(self, terme):
+        i = self.rang(terme)
+        if i == -1:
+            raise KeyError(terme)
+        return self.postings(i)
+
+    def get(self, terme, defaut=None):
+        i = self.rang(terme)
+        return defaut if i == -1 else self.postings(i)
+
+    def keys(self):
+        return [self._terme(i).decode("utf-8") for i in range(self._n)]
+
+    def values(self):
+        return [self.postings(i) for i in range(self._n)]
+
+    def items(self):
+        return [(self._terme(i).decode("utf-8"), self.postings(i)) for i in range(self._n)]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+
+def ouvrir_index(chemin):
+    """Ouvre un index inversé : binaire (.bin) par mmap, sinon CSV du TD4."""
+    if str(chemin).endswith(".bin"):
+        return IndexBinaire(chemin)
+    return charger_index(chemin)
+
+
+# -----------------------------------------------------
+# Migration des index CSV du TD4
+# -----------------------------------------------------
+def convertir_csv_en_binaire(chemin_csv, chemin_bin, chemin_positions=None):
+    """
+    Convertit un index inversé CSV du TD4 au format binaire. Si le fichier
+    de positions correspondant est fourni, l'index binaire est positionnel.
+    """
+    positions = charger_positions(chemin_positions) if chemin_positions else None
+    ecrire_index_binaire(charger_index(chemin_csv), chemin_bin, positions)
+
+
+if __name__ == "__main__":
+    # Usage : python index_inverse.py ../TD4/reverse_index_texte.csv [...]
+    # Chaque index.csv est converti en index.bin à côté du fichier d'origine,
+    # avec les positions de index_positions.csv si ce fichier existe.
+    chemins = sys.argv[1:] or [f"../TD4/reverse_index_{champ}.csv"
+                               for champ in ["texte", "titre", "rubrique", "date", "image"]]
+    for chemin_csv in chemins:
+        chemin_bin = chemin_csv.rsplit(".", 1)[0] + ".bin"
+        chemin_positions = chemin_csv.rsplit(".", 1)[0] + "_positions.csv"
+        if not os.path.exists(chemin_positions):
+            chemin_positions = None
+        convertir_csv_en_binaire(chemin_csv, chemin_bin, chemin_positions)
+        print(f"{chemin_csv} -> {chemin_bin}" + (" (positionnel)" if chemin_positions else ""))
@@ -0,0 +1,79 @@
+import pandas as pd
+
+from index_prefixes import IndexPrefixes
+from normalisation import plier, regrouper_par_cle
+from symspell import IndexSymSpell
+from table_corrections import charger_table, chemin_table
+
+
+# -----------------------------------------------------
+# Lexique forme -> lemme, chargé une seule fois par fichier
+# -----------------------------------------------------
+class Lexique:
+    """
+    Lexique du fichier de lemmes (colonnes mot, lemme), dédoublonné.
+
+    - lemme_par_mot : dictionnaire forme -> lemme (première occurrence du fichier),
+      une recherche exacte est donc un simple accès au dictionnaire
+    - formes        : formes distinctes, dans l'ordre du fichier
+    - symspell      : IndexSymSpell des formes (candidats à distance <= 2),
+      persisté à côté du fichier de lemmes
+    - prefixes      : IndexPrefixes des formes (candidats de recherche_proximite)
+    - formes_par_cle : formes regroupées par clé sans accents ni majuscules
+      ("cree" -> ["crée", "créé", ...]), pour les requêtes tapées sans accents
+    - table_corrections : corrections précalculées des fautes fréquentes
+      (table_corrections.py), consultées avant la recherche de candidats
+
+    Lexique.charger(chemin) renvoie toujours le même objet pour un même
+    fichier : les requêtes successives partagent le lexique et ses index.
+    """
+
+    _charges = {}
+
+    def __init__(self, lemmes_path):
+        self.chemin = lemmes_path
+        # Version du lexique (taille et date du fichier) : clé des caches de correction
+        self.version = (lemmes_path,) + IndexSymSpell.signature(lemmes_path)
+        lemmes = pd.read_csv(lemmes_path, sep="\t")
+        self.lemme_par_mot = {}
+        for mot, lemme in zip(lemmes["mot"], lemmes["lemme"]):
+            self.lemme_par_mot.setdefault(mot, lemme)
+        self.formes = list(self.lemme_par_mot)
+        self.symspell = IndexSymSpell.pour_lexique(lemmes_path, self.formes)
+        self.prefixes = IndexPrefixes(self.formes)
+        self.formes_par_cle = regrouper_par_cle(self.formes)
+        # Corrections précalculées des fautes fréquentes ({} tant que la table n'est pas construite)
+        self.table_corrections = charger_table(chemin_table(lemmes_path), self.version[1:])
+
+    @classmethod
+    def charger(cls, lemmes_path):
+        """Lexique du fichier lemmes_path, lu au premier appel puis réutilisé."""
+        if isinstance(lemmes_path, Lexique):
+            return lemmes_path
+        if lemmes_path not in cls._charges:
+            cls._charges[lemmes_path] = cls(lemmes_path)
+        return cls._charges[lemmes_path]
+
+    @classmethod
+    def recharger(cls, lemmes_path):
+        """Relit le fichier de lemmes (modifié sur le disque) ; charger renvoie ensuite ce nouveau lexique."""
+        cls._charges[lemmes_path] = cls(lemmes_path)
+        return cls._charges[lemmes_path]
+
+    def a_jour(self):
+        """Vrai si le fichier de lemmes n'a pas changé depuis la lecture du lexique."""
+        return self.version[1:] == IndexSymSpell.signature(self.chemin)
+
+    def __len__(self):
+        return len(self.formes)
+
+    def __contains__(self, mot):
+        return mot in self.lemme_par_mot
+
+    def formes_pliees(self, mot):
+        """Formes du lexique qui ne diffèrent de mot que par les accents ou la casse."""
+        return self.formes_par_cle.get(plier(mot), [])
+
+    def lemme(self, mot, defaut=None):
+        """Lemme de la forme mot, ou defaut si elle n'est pas dans le lexique."""
+        return self.lemme_par_mot.get(mot, defaut)
@@ -311,7 +311,7 @@ if __name__ == "__main__":
     ########################################################
     # Étape 2 : Traitement de la requête (analyse syntaxique)
     ########################################################
-    resultat = traiter_requete(requete)
+    resultat = degeler(traiter_requete(requete))
 
     ########################################################
     # Étape 3 : Correction orthographique des mots-clés
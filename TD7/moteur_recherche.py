@@ -0,0 +1,507 @@
+import json
+import os
+import time
+from functools import cached_property
+
+import numpy as np
+
+from cache import CacheLRU
+from bitmap import (DictionnaireDocs, IndexBitmaps, bitmap_depuis_denses, bitmap_et, bitmap_ou, bitmap_plein,
+                    bitmap_sauf, bitmap_vide, cardinalite, denses_depuis_bitmap)
+from classement import IndexBM25
+from index_dates import IndexDates
+from index_inverse import charger_positions, ouvrir_index
+from lexique import Lexique
+from requete_structuree import valider_requete
+
+from td5 import correction_orthographique, statistiques_correction
+from td6 import degeler, normaliser_requete, statistiques_analyse, traiter_requete
+
+
+# -----------------------------------------------------
+# Outils
+# -----------------------------------------------------
+def ids_en_chaines(docs):
+    """Reconvertit un tableau d'identifiants entiers en identifiants de bulletins (str)."""
+    return [str(doc) for doc in docs.tolist()]
+
+
+def forme_canonique(resultats):
+    """
+    Forme canonique (chaîne JSON) d'une requête analysée et corrigée : les
+    listes de termes combinés par un même opérateur sont triées et nettoyées,
+    de sorte que deux formulations équivalentes donnent la même clé de cache.
+    """
+    def termes(valeur):
+        if isinstance(valeur, list):
+            return sorted(str(v).strip() for v in valeur if v is not None)
+        return valeur.strip() if isinstance(valeur, str) else valeur
+
+    canonique = dict(resultats)
+    canonique["mots_cles"] = {"yes": termes(resultats["mots_cles"]["yes"]),
+                              "no": termes(resultats["mots_cles"].get("no"))}
+    canonique["titre"] = termes(resultats.get("titre"))
+    canonique["rubrique"] = termes(resultats.get("rubrique"))
+    return json.dumps(canonique, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def contient_expression(positions, proximite=None):
+    """
+    Vérifie, pour un document, que les termes d'une expression apparaissent :
+    - proximite=None : consécutivement et dans l'ordre (expression exacte) ;
+    - proximite=k    : à au plus k positions d'une même occurrence du premier terme (NEAR/k).
+
+    positions : liste des tableaux triés de positions de chaque terme dans le document.
+    """
+    debuts = positions[0]
+    for i, pos in enumerate(positions[1:], start=1):
+        if proximite is None:
+            debuts = np.intersect1d(debuts, pos - i, assume_unique=True)
+        else:
+            # Distance de chaque occurrence candidate à l'occurrence la plus proche du terme i
+            rangs = np.searchsorted(pos, debuts)
+            avant = np.abs(debuts - pos[np.clip(rangs - 1, 0, len(pos) - 1)])
+            apres = np.abs(pos[np.clip(rangs, 0, len(pos) - 1)] - debuts)
+            debuts = debuts[np.minimum(avant, apres) <= proximite]
+        if len(debuts) == 0:
+            return False
+    return True
+
+
+# -----------------------------------------------------
+# Moteur de recherche résident en mémoire
+# -----------------------------------------------------
+class MoteurRecherche:
+    """
+    Moteur de recherche qui charge les index inversés du TD4 une seule fois
+    et répond ensuite aux requêtes sans relire aucun fichier.
+
+    Les index sont des dictionnaires {terme: docs} (ou des index binaires qui
+    s'utilisent de la même façon). Les bulletins reçoivent un identifiant
+    dense (DictionnaireDocs) et chaque terme interrogé est converti une fois
+    en bitmap : tous les filtres de la requête se combinent ensuite par
+    ET / OU / ET NON vectorisés sur ces bitmaps.
+    """
+
+    def __init__(self, index_inverse_texte, index_inverse_date, index_inverse_rubrique,
+                 index_inverse_titre, index_inverse_image, lemmes_path,
+                 positions_texte=None, positions_titre=None, tf_path="../TD3/tf.csv",
+                 taille_cache=1024, ttl_cache=None, intervalle_verification=1.0):
+        self.lemmes_path = lemmes_path
+        self.tf_path = tf_path  # fréquences du TD3, pour le classement BM25
+        # Index positionnels CSV du TD4 (inutiles si les index binaires sont positionnels)
+        self._chemins_positions = {"texte": positions_texte, "titre": positions_titre}
+        self._chemins_index = {"texte": index_inverse_texte, "titre": index_inverse_titre,
+                               "rubrique": index_inverse_rubrique, "image": index_inverse_image,
+                               "date": index_inverse_date}
+
+        # Cache des résultats, indexé par la forme canonique de la requête corrigée,
+        # et cache qui associe le texte d'une requête déjà vue à cette forme canonique
+        self.cache_resultats = CacheLRU(taille_cache, ttl_cache)
+        self.cache_requetes = CacheLRU(taille_cache, ttl_cache)
+
+        # Délai minimal (s) entre deux vérifications des fichiers d'index sur le disque
+        self.intervalle_verification = intervalle_verification
+        self.version_index = 0
+        self.charger_index()
+
+    def _signature_index(self):
+        """Date de modification et taille de chaque fichier d'index et du lexique (détecte une reconstruction)."""
+        chemins = list(self._chemins_index.values()) + [c for c in self._chemins_positions.values() if c]
+        chemins.append(self.lemmes_path)
+        signature = []
+        for chemin in chemins:
+            stat = os.stat(chemin)
+            signature.append((chemin, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    def charger_index(self):
+        """
+        (Re)charge les index. Chaque chargement incrémente version_index,
+        vide les structures dérivées et invalide les caches de résultats.
+        """
+        self._signature = self._signature_index()
+        self._derniere_verification = time.monotonic()
+
+        # Index CSV du TD4 ou index binaires (.bin) ouverts par mmap
+        self.index_texte = ouvrir_index(self._chemins_index["texte"])
+        self.index_titre = ouvrir_index(self._chemins_index["titre"])
+        self.index_rubrique = ouvrir_index(self._chemins_index["rubrique"])
+        self.index_image = ouvrir_index(self._chemins_index["image"])
+        self.index_date = ouvrir_index(self._chemins_index["date"])
+
+        for attribut in ["dictionnaire", "bitmaps", "positions_csv", "dates", "lexique"]:
+            self.__dict__.pop(attribut, None)
+        self.version_index += 1
+        self.cache_resultats.vider()
+        self.cache_requetes.vider()
+
+    def verifier_version(self, forcer=False):
+        """
+        Recharge les index (et invalide les caches) si un fichier d'index a
+        changé sur le disque. Les fichiers ne sont examinés (os.stat) qu'une
+        fois par intervalle_verification secondes, sauf avec forcer=True.
+        """
+        maintenant = time.monotonic()
+        if not forcer and maintenant - self._derniere_verification < self.intervalle_verification:
+            return
+        self._derniere_verification = maintenant
+        if self._signature_index() != self._signature:
+            self.charger_index()
+
+    @cached_property
+    def dictionnaire(self):
+        """Dictionnaire des bulletins (chaque bulletin a une image "yes"/"no", une rubrique et une date)."""
+        petits_index = [self.index_image, self.index_rubrique, self.index_date]
+        return DictionnaireDocs(np.concatenate([docs for index in petits_index for docs in index.values()]))
+
+    @cached_property
+    def bitmaps(self):
+        """Vue bitmap de chaque index, construite terme par terme à la demande."""
+        return {
+            "texte": IndexBitmaps(self.index_texte, self.dictionnaire),
+            "titre": IndexBitmaps(self.index_titre, self.dictionnaire),
+            "rubrique": IndexBitmaps(self.index_rubrique, self.dictionnaire),
+            "image": IndexBitmaps(self.index_image, self.dictionnaire),
+        }
+
+    @cached_property
+    def positions_csv(self):
+        """Index positionnels CSV chargés à la première expression recherchée."""
+        return {champ: charger_positions(chemin) if chemin else {}
+                for champ, chemin in self._chemins_positions.items()}
+
+    @cached_property
+    def lexique(self):
+        """
+        Lexique forme -> lemme de la correction orthographique, partagé par
+        toutes les requêtes ; relu si le fichier de lemmes a changé.
+        """
+        lexique = Lexique.charger(self.lemmes_path)
+        return lexique if lexique.a_jour() else Lexique.recharger(self.lemmes_path)
+
+    @cached_property
+    def bm25(self):
+        """Index de classement BM25, chargé à la première recherche classée."""
+        return IndexBM25(self.tf_path)
+
+    @cached_property
+    def dates(self):
+        """Index trié des dates de publication (filtrage par dichotomie et masques)."""
+        return IndexDates(self.index_date, self.dictionnaire)
+
+    # -------------------------------------------------
+    # Outils internes
+    # -------------------------------------------------
+    @staticmethod
+    def _restreindre(docs_cherches, docs):
+        """Intersecte les candidats courants avec un nouveau filtre (None = pas encore de filtre)."""
+        if docs_cherches is None:
+            return docs
+        return bitmap_et(docs_cherches, docs)
+
+    def _verifier_positionnel(self, champ):
+        """Lève ValueError si aucun index positionnel n'est disponible pour le champ (texte ou titre)."""
+        index = self.index_texte if champ == "texte" else self.index_titre
+        if not getattr(index, "positionnel", False) and self._chemins_positions[champ] is None:
+            raise ValueError(f"expression sur le champ {champ} : aucun index positionnel "
+                             f"(index binaire positionnel ou positions_{champ} à fournir)")
+
+    def _positions(self, champ, terme):
+        """Positions {doc: positions} d'un terme du texte ou du titre, ou None."""
+        self._verifier_positionnel(champ)
+        index = self.index_texte if champ == "texte" else self.index_titre
+        if getattr(index, "positionnel", False):
+            return index.positions(terme)
+        return self.positions_csv[champ].get(terme)
+
+    def rechercher_expression(self, termes, champ="texte", proximite=None):
+        """
+        Bitmap des documents contenant l'expression (liste de termes ou chaîne)
+        dans le champ donné : expression exacte, ou termes à au plus `proximite`
+        positions les uns des autres (NEAR/k). Réponse tirée de l'index positionnel.
+        """
+        if isinstance(termes, str):
+            termes = termes.split()
+        positions = [self._positions(champ, terme.strip()) for terme in termes]
+        if not positions or any(p is None for p in positions):
+            return bitmap_vide(len(self.dictionnaire))
+
+        # Intersection des documents, en partant du terme le plus rare
+        docs = set(min(positions, key=len))
+        for p in positions:
+            docs &= p.keys()
+        trouves = [doc for doc in docs if contient_expression([p[doc] for p in positions], proximite)]
+        return bitmap_depuis_denses(self.dictionnaire.vers_denses(sorted(trouves)), len(self.dictionnaire))
+
+    # -------------------------------------------------
+    # Planification des critères booléens
+    # -------------------------------------------------
+    def _clause_termes(self, nom, champ, termes, operateur):
+        """
+        Clause portant sur des termes d'un index (mots-clés, titres, rubriques).
+        Un terme absent de l'index est remplacé par ses variantes accentuées
+        (union de leurs documents), ou ignoré s'il n'en a pas ;
+        l'estimation vient de la taille des postings.
+        """
+        index = self.bitmaps[champ]
+        groupes = [index.variantes(terme) for terme in termes]
+        tailles = sorted((sum(index.taille(v) for v in variantes), variantes) for variantes in groupes)
+        tailles = [(taille, variantes) for taille, variantes in tailles if taille > 0]
+        if not tailles:
+            estimation = 0
+        elif operateur == "ou":
+            estimation = min(len(self.dictionnaire), sum(taille for taille, _ in tailles))
+        else:
+            estimation = tailles[0][0]
+
+        def executer():
+            bitmaps = [bitmap_ou(*[index.get(v) for v in variantes]) for _, variantes in tailles]
+            if not bitmaps:
+                return bitmap_vide(len(self.dictionnaire))
+            if operateur == "ou":
+                return bitmap_ou(*bitmaps)
+            # Intersection de la plus petite liste à la plus grande, arrêt dès qu'elle est vide
+            docs = bitmaps[0]
+            for bitmap in bitmaps[1:]:
+                if not docs.any():
+                    break
+                docs = bitmap_et(docs, bitmap)
+            return docs
+
+        return {"clause": nom, "estimation": estimation, "executer": executer}
+
+    def planifier(self, resultats, avec_mots_cles=True):
+        """
+        Liste des critères booléens de la requête, de la plus sélective à la
+        moins sélective d'après les statistiques des index (taille des postings,
+        nombre de documents dans l'intervalle de dates).
+
+        Chaque clause est un dictionnaire {"clause", "estimation", "executer"},
+        executer() renvoyant le bitmap des documents qui la satisfont.
+        avec_mots_cles=False ignore les mots-clés positifs (pré-filtre BM25).
+        """
+        clauses = []
+
+        mots_cles = resultats["mots_cles"]
+        if avec_mots_cles and mots_cles["yes"]:
+            clauses.append(self._clause_termes(
+                "mots_cles", "texte", [mot.strip() for mot in mots_cles["yes"] if mot is not None],
+                resultats.get("operateurs_mots_cles")))
+
+        # Expressions : {"termes": [...] ou str, "champ": "texte"/"titre", "proximite": k ou None}
+        for expression in resultats.get("expressions") or []:
+            champ = expression.get("champ", "texte")
+            self._verifier_positionnel(champ)
+            termes = expression["termes"]
+            termes = termes.split() if isinstance(termes, str) else termes
+            clauses.append({
+                "clause": "expression " + " ".join(termes),
+                "estimation": min((self.bitmaps[champ].taille(t.strip()) for t in termes), default=0),
+                "executer": lambda termes=termes, champ=champ, expression=expression:
+                    self.rechercher_expression(termes, champ, expression.get("proximite")),
+            })
+
+        titres = resultats.get("titre")
+        if titres is not None:
+            if not isinstance(titres, list):
+                titres = [titres]
+            termes = []
+            for titre in titres:
+                for tr in [" ", '"', "'"]:
+                    titre = titre.replace(tr, "")
+                termes.append(titre)
+            clauses.append(self._clause_termes("titre", "titre", termes, resultats.get("operateurs_titre")))
+
+        rubriques = resultats.get("rubrique")
+        if rubriques is not None:
+            if not isinstance(rubriques, list):
+                rubriques = [rubriques]
+            clauses.append(self._clause_termes("rubrique", "rubrique", [r.strip() for r in rubriques],
+                                               resultats.get("operateurs_rubrique")))
+
+        if resultats.get("images") is not None:
+            clauses.append(self._clause_termes("images", "image", ["yes"], "ou"))
+
+        date = resultats.get("dates") or {}
+        if any(date.get(k) is not None for k in ["début", "fin", "précis", "not"]):
+            clauses.append({"clause": "dates", "estimation": self.dates.estimer(date),
+                            "executer": lambda: np.packbits(self.dates.filtrer(date))})
+
+        clauses.sort(key=lambda clause: clause["estimation"])
+        return clauses
+
+    def expliquer(self, resultats, avec_mots_cles=True):
+        """Plan choisi pour la requête, sans l'exécuter : [(clause, estimation)] dans l'ordre d'exécution."""
+        plan = [(c["clause"], c["estimation"]) for c in self.planifier(resultats, avec_mots_cles)]
+        if resultats["mots_cles"].get("no") is not None:
+            plan.append(("mot_exclu", None))
+        return plan
+
+    def filtrer(self, resultats, avec_mots_cles=True):
+        """
+        Bitmap des documents qui satisfont les critères booléens de la requête,
+        ou None si la requête n'impose aucun critère.
+
+        Les clauses sont exécutées dans l'ordre du plan (planifier) et le calcul
+        s'arrête dès que l'ensemble des candidats est vide. Le plan exécuté,
+        avec le nombre réel de documents après chaque étape, est conservé dans
+        self.dernier_plan pour le débogage. Le mot-clé exclu (ET NON) est
+        appliqué en dernier.
+        """
+        n = len(self.dictionnaire)
+        docs_cherches = None  # None = aucun critère appliqué pour l'instant
+        self.dernier_plan = []
+
+        for clause in self.planifier(resultats, avec_mots_cles):
+            docs_cherches = self._restreindre(docs_cherches, clause["executer"]())
+            self.dernier_plan.append({"clause": clause["clause"], "estimation": clause["estimation"],
+                                      "resultat": cardinalite(docs_cherches)})
+            if not docs_cherches.any():
+                return docs_cherches
+
+        mot_cle_not = resultats["mots_cles"].get("no")
+        if mot_cle_not is not None:
+            if docs_cherches is None:
+                docs_cherches = bitmap_plein(n)
+            exclus = self.bitmaps["texte"].get(mot_cle_not.strip())
+            if exclus is not None:
+                docs_cherches = bitmap_sauf(docs_cherches, exclus)
+            self.dernier_plan.append({"clause": "mot_exclu", "estimation": None,
+                                      "resultat": cardinalite(docs_cherches)})
+
+        return docs_cherches
+
+    def search(self, resultats):
+        """
+        Recherche les documents correspondant à une requête déjà analysée
+        (dictionnaire renvoyé par traiter_requete, mots-clés corrigés).
+
+        Retourne :
+        - la liste des documents trouvés, ou l'ensemble des rubriques
+          si la requête demande des rubriques.
+        """
+        n = len(self.dictionnaire)
+        docs_cherches = self.filtrer(resultats)
+        if docs_cherches is None:
+            docs_cherches = bitmap_vide(n)
+
+        # Partie 7 : documents ou rubriques
+        if resultats.get("return") != "rubriques":
+            return ids_en_chaines(self.dictionnaire.vers_bulletins(denses_depuis_bitmap(docs_cherches, n)))
+        index_rubrique = self.bitmaps["rubrique"]
+        return {rubrique for rubrique in index_rubrique.termes()
+                if bitmap_et(docs_cherches, index_rubrique.get(rubrique)).any()}
+
+    def rechercher_classe(self, resultats, k=10):
+        """
+        Recherche classée : les k documents de meilleur score BM25 pour les
+        mots-clés positifs, parmi ceux qui passent les autres critères de la
+        requête (titre, rubrique, images, dates, mot exclu, expressions).
+
+        Retourne une liste [(doc, score)] triée par score décroissant.
+        """
+        filtre = self.filtrer(resultats, avec_mots_cles=False)
+        if filtre is not None:
+            n = len(self.dictionnaire)
+            filtre = set(self.dictionnaire.vers_bulletins(denses_depuis_bitmap(filtre, n)).tolist())
+        termes = [mot.strip() for mot in resultats["mots_cles"]["yes"] if mot is not None]
+        return self.bm25.top_k(termes, k, filtre)
+
+    # -------------------------------------------------
+    # Chaîne complète : analyse, correction, recherche
+    # -------------------------------------------------
+    def corriger(self, resultat):
+        """Applique la correction orthographique aux mots-clés de la requête analysée."""
+        if resultat["mots_cles"]["no"] is not None:
+            resultat["mots_cles"]["no"] = correction_orthographique(
+                resultat["mots_cles"]["no"], self.lexique)
+        resultat["mots_cles"]["yes"] = [correction_orthographique(mot, self.lexique)
+                                        for mot in resultat["mots_cles"]["yes"]]
+        for expression in resultat.get("expressions") or []:
+            termes = expression["termes"]
+            termes = termes.split() if isinstance(termes, str) else termes
+            expression["termes"] = [correction_orthographique(t, self.lexique) or t for t in termes]
+        return resultat
+
+    def traiter_et_rechercher(self, requete):
+        """
+        Traite une requête en langage naturel : analyse, correction orthographique,
+        puis recherche des documents pertinents dans les index chargés en mémoire.
+
+        Les résultats sont mis en cache : une requête déjà vue (même texte) ne
+        repasse ni par l'analyse, ni par la correction, ni par la recherche ;
+        deux requêtes différentes qui donnent la même requête corrigée
+        partagent le même résultat.
+        """
+        self.verifier_version()
+        # Requête normalisée comme pour l'analyse ; la version du lexique
+        # distingue les corrections faites avec un lexique relu depuis
+        cle_texte = (self.version_index, self.lexique.version, normaliser_requete(requete))
+        cle = self.cache_requetes.get(cle_texte)
+        if cle is not None:
+            documents = self.cache_resultats.get(cle, CacheLRU.ABSENT)
+            if documents is not CacheLRU.ABSENT:
+                return type(documents)(documents)
+
+        # Analyse figée (partagée par le cache de td6) : on corrige une copie
+        resultat = self.corriger(degeler(traiter_requete(requete)))
+        cle = (self.version_index, forme_canonique(resultat))
+        self.cache_requetes.put(cle_texte, cle)
+        return self._rechercher_en_cache(cle, resultat)
+
+    def _rechercher_en_cache(self, cle, resultat):
+        """Documents de la requête analysée resultat, tirés du cache de résultats si possible."""
+        documents = self.cache_resultats.get(cle, CacheLRU.ABSENT)
+        if documents is CacheLRU.ABSENT:
+            documents = self.search(resultat)
+            self.cache_resultats.put(cle, documents)
+        # Copie : l'appelant peut modifier la liste sans altérer le cache
+        return type(documents)(documents)
+
+    # -------------------------------------------------
+    # Requêtes structurées : ni analyse, ni correction
+    # -------------------------------------------------
+    def rechercher_structuree(self, requete):
+        """
+        Recherche à partir d'une requête structurée (dictionnaire ou chaîne
+        JSON, schéma décrit dans requete_structuree) : validée une fois, elle
+        va directement à la recherche, sans traiter_requete ni correction
+        orthographique. Le cache de résultats est partagé avec
+        traiter_et_rechercher. Lève ValueError si la requête est invalide.
+        """
+        self.verifier_version()
+        resultat = valider_requete(requete)
+        return self._rechercher_en_cache((self.version_index, forme_canonique(resultat)), resultat)
+
+    def classer_structuree(self, requete, k=10):
+        """Comme rechercher_structuree, mais renvoie les k meilleurs documents classés par BM25."""
+        self.verifier_version()
+        return self.rechercher_classe(valider_requete(requete), k)
+
+    def statistiques_cache(self):
+        """Compteurs des caches de requêtes, de résultats, d'analyses et de corrections."""
+        return {"requetes": self.cache_requetes.statistiques(),
+                "resultats": self.cache_resultats.statistiques(),
+                "analyses": statistiques_analyse(),
+                "corrections": statistiques_correction()}
+
+    def traiter_et_classer(self, requete, k=10):
+        """Comme traiter_et_rechercher, mais renvoie les k meilleurs documents classés par BM25."""
+        self.verifier_version()
+        resultat = self.corriger(degeler(traiter_requete(requete)))
+        return self.rechercher_classe(resultat, k)
+
+
+if __name__ == "__main__":
+    moteur = MoteurRecherche(
+        "../TD4/reverse_index_texte.csv",
+        "../TD4/reverse_index_date.csv",
+        "../TD4/reverse_index_rubrique.csv",
+        "../TD4/reverse_index_titre.csv",
+        "../TD4/reverse_index_image.csv",
+        "lemmes_lower.csv",
+    )
+    requete = input("Entrez votre requête en langage naturel : ")
+    print(moteur.traiter_et_rechercher(requete))
+    print("Classement BM25 :", moteur.traiter_et_classer(requete))
@@ -0,0 +1,40 @@
+import argparse
+import contextlib
+import io
+import json
+import sys
+
+from td6 import degeler, traiter_requete
+
+
+# -----------------------------------------------------
+# Vérification de l'analyseur de requêtes sur les résultats de référence
+# -----------------------------------------------------
+# requetes_golden.json : liste de {"requete", "resultat"} produite par
+# l'analyseur d'origine sur les requêtes de TD6/requetes_as_they_are.txt.
+
+def comparer(chemin):
+    """Liste des (requete, attendu, obtenu) pour lesquelles traiter_requete diffère de la référence."""
+    with open(chemin, encoding="utf-8") as f:
+        references = json.load(f)
+    differences = []
+    for reference in references:
+        with contextlib.redirect_stdout(io.StringIO()):
+            obtenu = degeler(traiter_requete(reference["requete"]))
+        # Aller-retour JSON : mêmes types que la référence (tuples -> listes)
+        obtenu = json.loads(json.dumps(obtenu, ensure_ascii=False))
+        if obtenu != reference["resultat"]:
+            differences.append((reference["requete"], reference["resultat"], obtenu))
+    return references, differences
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare traiter_requete aux résultats de référence.")
+    parser.add_argument("--golden", default="requetes_golden.json")
+    args = parser.parse_args()
+
+    references, differences = comparer(args.golden)
+    for requete, attendu, obtenu in differences:
+        print(f"Requête : {requete}\n  attendu : {attendu}\n  obtenu  : {obtenu}\n")
+    print(f"{len(references) - len(differences)}/{len(references)} requêtes identiques")
+    sys.exit(1 if differences else 0)
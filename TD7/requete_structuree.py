@@ -0,0 +1,187 @@
+import json
+
+
+# -----------------------------------------------------
+# Requêtes structurées (clients programmatiques)
+# -----------------------------------------------------
+# Un client qui connaît déjà les critères de sa recherche envoie directement
+# le dictionnaire que produirait traiter_requete, sans phrase en français :
+# la requête est validée puis transmise au moteur, sans analyse ni correction
+# orthographique.
+#
+# Schéma (toutes les clés sont facultatives) :
+#
+# {
+#     "return": "articles" | "article" | "bulletins" | "recherches" | "rubriques",
+#     "mots_cles": {"yes": [str, ...] ou str, "no": str ou null},
+#     "operateurs_mots_cles": "et" | "ou" | null,
+#     "rubrique": str | [str, ...] | null,
+#     "operateurs_rubrique": "et" | "ou" | null,
+#     "titre": str | [str, ...] | null,
+#     "operateurs_titre": "et" | "ou" | null,
+#     "dates": {"début": date, "fin": date, "précis": date, "not": date},
+#     "images": true | null,
+#     "expressions": [{"termes": [str, ...] ou str, "champ": "texte" | "titre",
+#                      "proximite": int ou null}, ...]
+# }
+#
+# date : {"j": .., "m": .., "a": ..} (composantes facultatives, entiers ou
+# chaînes de chiffres), "jj/mm/aaaa", ou "aaaa[-mm[-jj]]". Les termes sont
+# mis en minuscules comme ceux des index ; "return" vaut "articles" par défaut.
+#
+# Les expressions (exactes ou NEAR/k) n'existent que dans ces requêtes
+# structurées (traiter_requete n'en produit pas) et demandent un moteur
+# construit avec un index positionnel du champ : positions_texte /
+# positions_titre (../TD4/reverse_index_*_positions.csv) ou index binaire
+# positionnel.
+
+RETOURS = ["articles", "article", "bulletins", "recherches", "rubriques"]
+OPERATEURS = ["et", "ou"]
+CHAMPS_EXPRESSION = ["texte", "titre"]
+CLES_DATES = ["début", "fin", "précis", "not"]
+CLES = ["return", "mots_cles", "operateurs_mots_cles", "rubrique", "operateurs_rubrique",
+        "titre", "operateurs_titre", "dates", "images", "expressions"]
+
+
+def _terme(valeur, champ):
+    if not isinstance(valeur, str) or not valeur.strip():
+        raise ValueError(f"{champ} : chaîne non vide attendue, reçu {valeur!r}")
+    return valeur.strip().lower()
+
+
+def _termes(valeur, champ):
+    """Une chaîne ou une liste de chaînes -> liste de termes."""
+    if isinstance(valeur, str):
+        return [_terme(valeur, champ)]
+    if not isinstance(valeur, list):
+        raise ValueError(f"{champ} : chaîne ou liste de chaînes attendue, reçu {valeur!r}")
+    return [_terme(v, champ) for v in valeur]
+
+
+def _un_ou_plusieurs(valeur, champ):
+    """Rubrique ou titre : None, une chaîne, ou une liste (un seul élément -> chaîne, comme traiter_requete)."""
+    if valeur is None:
+        return None
+    termes = _termes(valeur, champ)
+    if not termes:
+        return None
+    return termes[0] if len(termes) == 1 else termes
+
+
+def _operateur(valeur, champ):
+    if valeur is not None and valeur not in OPERATEURS:
+        raise ValueError(f"{champ} : {OPERATEURS} ou null attendu, reçu {valeur!r}")
+    return valeur
+
+
+def _composante(valeur, champ, chiffres):
+    if valeur is None:
+        return None
+    if isinstance(valeur, bool) or not isinstance(valeur, (int, str)) or not str(valeur).isdigit():
+        raise ValueError(f"{champ} : nombre attendu, reçu {valeur!r}")
+    return str(int(valeur)).zfill(chiffres)
+
+
+def _date(valeur, champ):
+    """Date de requête au format de clean_date : {"j", "m", "a"} (chaînes de chiffres ou None)."""
+    if valeur is None:
+        return None
+    if isinstance(valeur, str):
+        if "/" in valeur:
+            parties = valeur.split("/")
+            if len(parties) != 3:
+                raise ValueError(f"{champ} : date jj/mm/aaaa attendue, reçu {valeur!r}")
+            valeur = dict(zip(["j", "m", "a"], parties))
+        else:
+            parties = valeur.split("-")
+            if len(parties) > 3:
+                raise ValueError(f"{champ} : date aaaa[-mm[-jj]] attendue, reçu {valeur!r}")
+            valeur = dict(zip(["a", "m", "j"], parties))
+    if not isinstance(valeur, dict) or set(valeur) - {"j", "m", "a"}:
+        raise ValueError(f"{champ} : date {{\"j\", \"m\", \"a\"}} attendue, reçu {valeur!r}")
+    date = {"j": _composante(valeur.get("j"), champ + ".j", 2),
+            "m": _composante(valeur.get("m"), champ + ".m", 2),
+            "a": _composante(valeur.get("a"), champ + ".a", 4)}
+    if date["m"] is not None and not 1 <= int(date["m"]) <= 12:
+        raise ValueError(f"{champ}.m : mois entre 1 et 12 attendu, reçu {valeur['m']!r}")
+    if date["j"] is not None and not 1 <= int(date["j"]) <= 31:
+        raise ValueError(f"{champ}.j : jour entre 1 et 31 attendu, reçu {valeur['j']!r}")
+    if all(v is None for v in date.values()):
+        raise ValueError(f"{champ} : date vide")
+    return date
+
+
+def _expression(valeur, i):
+    champ = f"expressions[{i}]"
+    if not isinstance(valeur, dict) or "termes" not in valeur or set(valeur) - {"termes", "champ", "proximite"}:
+        raise ValueError(f"{champ} : {{\"termes\", \"champ\", \"proximite\"}} attendu, reçu {valeur!r}")
+    termes = valeur["termes"]
+    termes = _termes(termes.split() if isinstance(termes, str) else termes, champ + ".termes")
+    if not termes:
+        raise ValueError(f"{champ}.termes : au moins un terme attendu")
+    champ_index = valeur.get("champ", "texte")
+    if champ_index not in CHAMPS_EXPRESSION:
+        raise ValueError(f"{champ}.champ : {CHAMPS_EXPRESSION} attendu, reçu {champ_index!r}")
+    proximite = valeur.get("proximite")
+    if proximite is not None and (isinstance(proximite, bool) or not isinstance(proximite, int) or proximite < 0):
+        raise ValueError(f"{champ}.proximite : entier positif ou null attendu, reçu {proximite!r}")
+    return {"termes": termes, "champ": champ_index, "proximite": proximite}
+
+
+def valider_requete(requete):
+    """
+    Valide une requête structurée (dictionnaire, ou chaîne JSON) et la met
+    sous la forme exacte du dictionnaire de traiter_requete.
+
+    Lève ValueError (message indiquant le champ fautif) si la requête ne
+    respecte pas le schéma.
+    """
+    if isinstance(requete, (str, bytes)):
+        try:
+            requete = json.loads(requete)
+        except json.JSONDecodeError as erreur:
+            raise ValueError(f"requête JSON illisible : {erreur}") from None
+    if not isinstance(requete, dict):
+        raise ValueError(f"requête : objet attendu, reçu {type(requete).__name__}")
+    inconnues = set(requete) - set(CLES)
+    if inconnues:
+        raise ValueError(f"clés inconnues : {sorted(inconnues)} (clés possibles : {CLES})")
+
+    retour = requete.get("return") or "articles"
+    if retour not in RETOURS:
+        raise ValueError(f"return : {RETOURS} attendu, reçu {retour!r}")
+
+    mots_cles = requete.get("mots_cles") or {}
+    if not isinstance(mots_cles, dict) or set(mots_cles) - {"yes", "no"}:
+        raise ValueError(f"mots_cles : {{\"yes\", \"no\"}} attendu, reçu {mots_cles!r}")
+    oui = mots_cles.get("yes")
+    non = mots_cles.get("no")
+
+    dates = requete.get("dates") or {}
+    if not isinstance(dates, dict) or set(dates) - set(CLES_DATES):
+        raise ValueError(f"dates : clés parmi {CLES_DATES} attendues, reçu {dates!r}")
+
+    # Pas de filtre "sans images" : false est refusé plutôt qu'ignoré
+    images = requete.get("images")
+    if images is not None and images is not True:
+        raise ValueError(f"images : true ou null attendu, reçu {images!r}")
+
+    expressions = requete.get("expressions")
+    if expressions is not None and not isinstance(expressions, list):
+        raise ValueError(f"expressions : liste attendue, reçu {expressions!r}")
+
+    resultats = {
+        "return": retour,
+        "mots_cles": {"yes": [] if oui is None else _termes(oui, "mots_cles.yes"),
+                      "no": None if non is None else _terme(non, "mots_cles.no")},
+        "operateurs_mots_cles": _operateur(requete.get("operateurs_mots_cles"), "operateurs_mots_cles"),
+        "rubrique": _un_ou_plusieurs(requete.get("rubrique"), "rubrique"),
+        "operateurs_rubrique": _operateur(requete.get("operateurs_rubrique"), "operateurs_rubrique"),
+        "dates": {cle: _date(dates.get(cle), "dates." + cle) for cle in CLES_DATES},
+        "titre": _un_ou_plusieurs(requete.get("titre"), "titre"),
+        "operateurs_titre": _operateur(requete.get("operateurs_titre"), "operateurs_titre"),
+        "images": images,
+    }
+    if expressions:
+        resultats["expressions"] = [_expression(e, i) for i, e in enumerate(expressions)]
+    return resultats
@@ -1,9 +1,20 @@
 from td7 import *
+from moteur_recherche import MoteurRecherche
 import time
 import pandas as pd
 
 import matplotlib.pyplot as plt
 
+# Les index sont chargés une seule fois, les requêtes ne relisent plus les CSV
+moteur = MoteurRecherche(
+    index_inverse_texte,
+    index_inverse_date,
+    index_inverse_rubrique,
+    index_inverse_titre,
+    index_inverse_image,
+    lemmes_path
+)
+
 def get_precision_recall(docs_predits, docs_pertinents):
     """
     Calcule la précision et le rappel pour une requête.
@@ -35,7 +46,7 @@ def get_all_precisions_recalls(requetes_10, docs_pertinents_manuel):
     precisions = []
     rappels = []
     for req, docs_pert in zip(requetes_10, docs_pertinents_manuel):
-        docs_predits = traiter_et_rechercher(req)
+        docs_predits = moteur.traiter_et_rechercher(req)
         precision, rappel = get_precision_recall(docs_predits, docs_pert)
         precisions.append(precision)
         rappels.append(rappel)
@@ -48,7 +59,7 @@ def measure_average_time(requetes_10, n=100):
     start = time.time()
     for _ in range(n):
         for req in requetes_10:
-            traiter_et_rechercher(req)
+            moteur.traiter_et_rechercher(req)
     end = time.time()
     avg_time = (end - start) / (n * len(requetes_10))
     return avg_time
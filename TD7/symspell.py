@@ -0,0 +1,94 @@
+import os
+import pickle
+from itertools import combinations
+
+
+# -----------------------------------------------------
+# Index de suppressions symétriques (SymSpell)
+# -----------------------------------------------------
+def suppressions(mot, distance_max):
+    """
+    Ensemble des chaînes obtenues en supprimant jusqu'à distance_max caractères de mot
+    (mot lui-même compris).
+    """
+    resultat = {mot}
+    for k in range(1, min(distance_max, len(mot)) + 1):
+        for positions in combinations(range(len(mot)), k):
+            resultat.add("".join(c for i, c in enumerate(mot) if i not in positions))
+    return resultat
+
+
+class IndexSymSpell:
+    """
+    Index des candidats à la correction orthographique.
+
+    Deux mots à distance d'édition <= d ont toujours une suppression commune
+    d'au plus d caractères chacun. On associe donc, une fois pour toutes, à
+    chaque suppression des formes du lexique la liste de ces formes : les
+    candidats d'un mot inconnu s'obtiennent en générant ses propres
+    suppressions et en les cherchant dans ce dictionnaire, sans parcourir le
+    lexique. Les candidats sont ensuite vérifiés par la distance de Levenshtein.
+
+    Les formes sont désignées par leur rang dans le lexique, ce qui permet de
+    départager les ex-aequo dans l'ordre du fichier, comme le parcours d'origine.
+    """
+
+    def __init__(self, formes, distance_max=2):
+        self.formes = list(formes)
+        self.distance_max = distance_max
+        self.suppressions = {}
+        for rang, forme in enumerate(self.formes):
+            for s in suppressions(forme, distance_max):
+                self.suppressions.setdefault(s, []).append(rang)
+
+    def candidats(self, mot):
+        """Rangs (triés) des formes susceptibles d'être à distance <= distance_max de mot."""
+        rangs = set()
+        for s in suppressions(mot, self.distance_max):
+            rangs.update(self.suppressions.get(s, ()))
+        return sorted(rangs)
+
+    # -------------------------------------------------
+    # Persistance
+    # -------------------------------------------------
+    @staticmethod
+    def signature(chemin):
+        """Taille et date de modification du lexique source (détecte une modification)."""
+        stat = os.stat(chemin)
+        return stat.st_size, stat.st_mtime_ns
+
+    def sauvegarder(self, chemin, signature):
+        with open(chemin, "wb") as f:
+            pickle.dump((signature, self.distance_max, self.formes, self.suppressions), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def charger(cls, chemin, signature, distance_max):
+        """Index sauvegardé dans chemin, ou None s'il est absent ou construit sur un autre lexique."""
+        try:
+            with open(chemin, "rb") as f:
+                signature_index, distance_index, formes, table = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        if signature_index != signature or distance_index != distance_max:
+            return None
+        index = cls.__new__(cls)
+        index.formes, index.distance_max, index.suppressions = formes, distance_max, table
+        return index
+
+    @classmethod
+    def pour_lexique(cls, chemin_lexique, formes, distance_max=2):
+        """
+        Index du lexique chemin_lexique : relu depuis chemin_lexique + ".symspell"
+        s'il est à jour, sinon construit à partir de formes puis sauvegardé.
+        """
+        chemin_index = chemin_lexique + ".symspell"
+        signature = cls.signature(chemin_lexique)
+        index = cls.charger(chemin_index, signature, distance_max)
+        if index is None or index.formes != list(formes):
+            index = cls(formes, distance_max)
+            try:
+                index.sauvegarder(chemin_index, signature)
+            except OSError:
+                pass  # répertoire en lecture seule : l'index reste en mémoire
+        return index
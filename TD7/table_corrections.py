@@ -0,0 +1,110 @@
+import argparse
+import contextlib
+import io
+import os
+import time
+
+import pandas as pd
+
+
+# -----------------------------------------------------
+# Table précalculée des fautes de frappe fréquentes
+# -----------------------------------------------------
+# Pour les formes les plus fréquentes du corpus, toutes les chaînes à une
+# distance d'édition de 1 (suppression, transposition, substitution,
+# insertion) sont corrigées hors ligne avec l'algorithme en ligne, dans la
+# limite d'un budget d'entrées. À l'exécution, ces fautes se corrigent par
+# un simple accès au dictionnaire ; les autres passent par la recherche
+# de candidats (index SymSpell puis index des préfixes).
+
+LETTRES = "abcdefghijklmnopqrstuvwxyzéàèùâêîôûçëïüœæ"  # alphabet de SpellCorrector._edits1
+BUDGET = 100_000
+
+
+def chemin_table(lemmes_path):
+    """Fichier de la table associé au fichier de lemmes (ex: lemmes_lower_corrections.csv)."""
+    return os.path.splitext(lemmes_path)[0] + "_corrections.csv"
+
+
+def edits1(mot, lettres=LETTRES):
+    """Chaînes à une distance d'édition de 1 de mot (transpositions comprises)."""
+    coupes = [(mot[:i], mot[i:]) for i in range(len(mot) + 1)]
+    suppressions = [g + d[1:] for g, d in coupes if d]
+    transpositions = [g + d[1] + d[0] + d[2:] for g, d in coupes if len(d) > 1]
+    substitutions = [g + c + d[1:] for g, d in coupes if d for c in lettres]
+    insertions = [g + c + d for g, d in coupes for c in lettres]
+    return set(suppressions + transpositions + substitutions + insertions)
+
+
+def frequences_corpus(chemin_tf):
+    """Nombre total d'occurrences de chaque mot dans le corpus (fichier tf.csv du TD3)."""
+    tf = pd.read_csv(chemin_tf, sep="\t", keep_default_na=False, dtype={"mot": str})
+    tf["tf"] = pd.to_numeric(tf["tf"], errors="coerce")
+    return tf.dropna(subset=["tf"]).groupby("mot")["tf"].sum().to_dict()
+
+
+def construire_table(lexique, frequences, corriger, budget=BUDGET):
+    """
+    Table {faute: correction} des voisins à distance 1 des formes du lexique,
+    prises par fréquence décroissante dans le corpus, jusqu'à budget entrées.
+
+    corriger(mot, lexique) est la correction en ligne : la table en donne
+    exactement le résultat. Les voisins qui sont eux-mêmes des formes du
+    lexique, ou que la correction laisse inchangés, ne sont pas stockés.
+    """
+    formes = sorted(lexique.formes, key=lambda forme: -frequences.get(forme, 0))
+    table = {}
+    deja_vus = set()
+    for forme in formes:
+        if len(table) >= budget:
+            break
+        for faute in sorted(edits1(forme)):
+            if faute in deja_vus or faute in lexique:
+                continue
+            deja_vus.add(faute)
+            correction = corriger(faute, lexique)
+            if correction != faute:
+                table[faute] = correction
+                if len(table) >= budget:
+                    break
+    return table
+
+
+def ecrire_table(table, chemin, version):
+    """Écrit la table (TSV faute/correction), précédée de la version du lexique sur une ligne de commentaire."""
+    with open(chemin, "w", encoding="utf-8") as f:
+        f.write("# " + " ".join(map(str, version)) + "\n")
+        f.write("faute\tcorrection\n")
+        for faute, correction in table.items():
+            f.write(f"{faute}\t{correction}\n")
+
+
+def charger_table(chemin, version):
+    """Table écrite par ecrire_table, ou {} si elle est absente ou construite sur une autre version du lexique."""
+    try:
+        with open(chemin, encoding="utf-8") as f:
+            if f.readline().strip() != "# " + " ".join(map(str, version)):
+                return {}
+            table = pd.read_csv(f, sep="\t", keep_default_na=False, dtype=str)
+    except OSError:
+        return {}
+    return dict(zip(table["faute"], table["correction"]))
+
+
+if __name__ == "__main__":
+    from lexique import Lexique
+    from td5 import corriger_sans_table
+
+    parser = argparse.ArgumentParser(description="Précalcule la correction des fautes fréquentes (distance 1).")
+    parser.add_argument("--lexique", default="lemmes_lower.csv")
+    parser.add_argument("--tf", default="../TD3/tf.csv", help="fréquences du corpus (TD3)")
+    parser.add_argument("--budget", type=int, default=BUDGET, help="nombre maximal d'entrées")
+    args = parser.parse_args()
+
+    debut = time.perf_counter()
+    lexique = Lexique.charger(args.lexique)
+    with contextlib.redirect_stdout(io.StringIO()):  # messages "no lemma found" de la correction
+        table = construire_table(lexique, frequences_corpus(args.tf), corriger_sans_table, args.budget)
+    chemin = chemin_table(args.lexique)
+    ecrire_table(table, chemin, lexique.version[1:])
+    print(f"{len(table)} corrections écrites dans {chemin} en {time.perf_counter() - debut:.1f} s")
@@ -1,4 +1,6 @@
-import numpy as np
+from cache import CacheLRU
+from distance import distance, plus_proche
+from lexique import Lexique
 
 def recherche_proximite(m1, m2, seuilMin = 3, seuilMax = 4):
     l1 = len(m1)
@@ -13,108 +15,107 @@ def recherche_proximite(m1, m2, seuilMin = 3, seuilMax = 4):
             i += 1
         return 100*i/max(l1, l2)
     
+def distance_levenshtein(word, candidate, distance_max=None):
+    return distance(word, candidate, distance_max)
+
 def levenshtein(word, mots_candidats):
-    best_dist = float('inf')
-    best_mot = ""
-    lw = len(word)
-
-    for candidate in mots_candidats:
-        lc = len(candidate)
-        dist = np.zeros((lw + 1, lc + 1), dtype=int)
-
-        # Initialisation
-        for i in range(lw + 1):
-            dist[i][0] = i
-        for j in range(lc + 1):
-            dist[0][j] = j
-
-        # Remplissage
-        for i in range(1, lw + 1):
-            for j in range(1, lc + 1):
-                if word[i - 1] == candidate[j - 1]:
-                    cost = 0
-                else:
-                    cost = 1
-                dist[i][j] = min(dist[i - 1][j] + 1,     # suppression
-                                 dist[i][j - 1] + 1,     # insertion
-                                 dist[i - 1][j - 1] + cost)  # substitution
-
-        if dist[lw][lc] < best_dist:
-            best_dist = dist[lw][lc]
-            best_mot = candidate
-
-    return best_mot
-
-
-import pandas as pd
+    best_mot, _ = plus_proche(word, mots_candidats)
+    return best_mot if best_mot is not None else ""
+
+
 def lemmatize(lemmes_path):
-    lemmes = pd.read_csv(lemmes_path, sep="\t")
+    lexique = Lexique.charger(lemmes_path)
 
     phrase: str = input("Ecrivez une phrase: ")
     phrase = phrase.lower()
     words = phrase.split()
     print(words)
     for word in words:
-        if word in lemmes["mot"].values:
-            lemme = lemmes.loc[lemmes["mot"] == word, "lemme"].values[0]
+        if word in lexique:
+            lemme = lexique.lemme(word)
             phrase = phrase.replace(word, lemme)
         else: 
-            mots_candidats = []
-            for mot in lemmes["mot"]:
-                dist = recherche_proximite(word, mot, 3, 4)
-                if dist != 0:
-                    mots_candidats.append(mot)
+            mots_candidats = [lexique.formes[rang] for rang in lexique.prefixes.candidats(word, 3, 4)]
             if len(mots_candidats) == 0:
                 print("no lemma found for: ", word)
             else:
                 mot_result = levenshtein(word ,mots_candidats)
-                lemme = lemmes.loc[lemmes["mot"] == mot_result, "lemme"].values[0]
+                lemme = lexique.lemme(mot_result)
                 phrase = phrase.replace(word, str(lemme))
     return phrase
 
-import pandas as pd
 def lemmatize_corpus(lemmes_path):
-    lemmes = pd.read_csv(lemmes_path, sep="\t")
+    lexique = Lexique.charger(lemmes_path)
 
     phrase: str = input("Ecrivez une phrase: ")
     phrase = phrase.lower()
     words = phrase.split()
     print(words)
     for word in words:
-        if word in lemmes["mot"].values:
-            lemme = lemmes.loc[lemmes["mot"] == word, "lemme"].values[0]
+        if word in lexique:
+            lemme = lexique.lemme(word)
             phrase = phrase.replace(word, lemme)
         else: 
-            mots_candidats = []
-            for mot in lemmes["mot"]:
-                dist = recherche_proximite(word, mot, 3, 4)
-                if dist != 0:
-                    mots_candidats.append(mot)
+            mots_candidats = [lexique.formes[rang] for rang in lexique.prefixes.candidats(word, 3, 4)]
             if len(mots_candidats) == 0:
                 print("no lemma found for: ", word)
             else:
                 mot_result = levenshtein(word ,mots_candidats)
-                lemme = lemmes.loc[lemmes["mot"] == mot_result, "lemme"].values[0]
+                lemme = lexique.lemme(mot_result)
                 phrase = phrase.replace(word, str(lemme))
     return phrase
 
+# Corrections déjà calculées, y compris les mots sans correction :
+# clé (version du lexique, mot normalisé) -> lemme
+cache_corrections = CacheLRU(taille_max=8192)
+
+def statistiques_correction():
+    return cache_corrections.statistiques()
+
 def correction_orthographique(mot, lemmes_path):
-    lemmes = pd.read_csv(lemmes_path, sep="\t")
+    # lemmes_path : chemin du fichier de lemmes ou Lexique déjà chargé
+    lexique = Lexique.charger(lemmes_path)
     mot = mot.lower().strip()
     if mot in "  \n\t":
         return None
-    
-    if mot in lemmes["mot"].values:
-            lemme = lemmes.loc[lemmes["mot"] == mot, "lemme"].values[0]
-    else: 
-            mots_candidats = []
-            for lemme in lemmes["mot"]:
-                dist = recherche_proximite(mot, lemme, 3, 4)
-                if dist != 0:
-                    mots_candidats.append(lemme)
-            if len(mots_candidats) == 0:
-                print("no lemma found for: ", mot)
-            else:
-                mot_result = levenshtein(mot ,mots_candidats)
-                lemme = lemmes.loc[lemmes["mot"] == mot_result, "lemme"].values[0]
-    return str(lemme)
\ No newline at end of file
+
+    cle = (lexique.version, mot)
+    lemme = cache_corrections.get(cle)
+    if lemme is None:
+        lemme = _corriger(mot, lexique)
+        cache_corrections.put(cle, lemme)
+    return lemme
+
+def _corriger(mot, lexique):
+    lemme = lexique.lemme(mot)
+    if lemme is not None:
+        return str(lemme)
+
+    # Mot tapé sans accents : forme accentuée la plus proche, par simple accès au dictionnaire
+    formes = lexique.formes_pliees(mot)
+    if formes:
+        return str(lexique.lemme(plus_proche(mot, formes)[0]))
+
+    # Faute fréquente : correction précalculée hors ligne (table_corrections.py)
+    correction = lexique.table_corrections.get(mot)
+    if correction is not None:
+        return correction
+    return corriger_sans_table(mot, lexique)
+
+def corriger_sans_table(mot, lexique):
+    lemme = lexique.lemme(mot)
+    if lemme is not None:
+        return str(lemme)
+
+    # Candidats à distance <= 2 via l'index de suppressions (dans l'ordre du lexique),
+    # puis, si aucun n'est assez proche, candidats de recherche_proximite via l'index des préfixes
+    formes = [lexique.formes[rang] for rang in lexique.symspell.candidats(mot)]
+    mots_candidats = [forme for forme in formes if recherche_proximite(mot, forme, 3, 4) != 0
+                      and distance_levenshtein(mot, forme, lexique.symspell.distance_max) <= lexique.symspell.distance_max]
+    if len(mots_candidats) == 0:
+        mots_candidats = [lexique.formes[rang] for rang in lexique.prefixes.candidats(mot, 3, 4)]
+    if len(mots_candidats) == 0:
+        print("no lemma found for: ", mot)
+        return mot
+    mot_result = levenshtein(mot, mots_candidats)
+    return str(lexique.lemme(mot_result))
@@ -1,3 +1,11 @@
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from types import MappingProxyType
+
+from aho_corasick import AutomateAhoCorasick
+from cache import CacheLRU
+
 ponctuations = [
     ".", ",", "?"
     ]
@@ -13,16 +21,116 @@ articles_fr = [
 ]
 
 
+#---------------Reconnaissance des mots-repères ----------------------
+# Les listes de mots-repères sont préparées une seule fois. Une liste courte
+# est reconnue par quelques recherches en C (expression régulière, str.find),
+# plus rapides qu'un parcours caractère par caractère en Python ; à partir
+# de SEUIL_AUTOMATE repères, la liste est reconnue par un automate
+# d'Aho-Corasick, dont le parcours ne dépend plus du nombre de repères.
+SEUIL_AUTOMATE = 100
+
+@lru_cache(maxsize=None)
+def compiler(reperes):
+    """Expression régulière reconnaissant l'un des repères (tuple), dans l'ordre de la liste à position égale."""
+    return re.compile("|".join(re.escape(repere) for repere in reperes))
+
+@lru_cache(maxsize=None)
+def _automate(reperes):
+    return AutomateAhoCorasick({None: reperes})
+
+def reperes_presents(texte, reperes):
+    """
+    Positions des repères présents dans texte, dans l'ordre de la liste :
+    [(repère, [positions croissantes])], un élément par rang (un repère
+    présent deux fois dans la liste y figure deux fois). Un seul parcours
+    de l'automate de la liste.
+    """
+    automate = _automate(tuple(reperes))
+    positions = {}
+    for position, repere, _ in automate.correspondances(texte):
+        if not positions.get(repere) or positions[repere][-1] != position:
+            positions.setdefault(repere, []).append(position)
+    rangs = automate.rangs[None]
+    return [(repere, positions[repere]) for _, repere in sorted(
+        (rang, repere) for repere in positions for rang in rangs[repere])]
+
+def premiere_occurrence(texte, reperes):
+    """(position, repère) de la première occurrence de l'un des repères dans texte (à position égale, le premier de la liste), ou None."""
+    reperes = tuple(reperes)
+    if len(reperes) < SEUIL_AUTOMATE:
+        trouve = compiler(reperes).search(texte)
+        return (trouve.start(), trouve.group()) if trouve else None
+    trouvees = _automate(reperes).correspondances(texte)
+    return trouvees[0][:2] if trouvees else None
+
+def premier_present(texte, reperes):
+    """Premier repère de la liste présent dans texte, ou None."""
+    if len(reperes) < SEUIL_AUTOMATE:
+        return next((repere for repere in reperes if repere in texte), None)
+    presents = reperes_presents(texte, reperes)
+    return presents[0][0] if presents else None
+
+def avancer(texte, reperes):
+    """
+    Indice atteint en passant, pour chaque repère (dans l'ordre de la liste),
+    après sa première occurrence qui suit l'indice courant (0 au départ).
+    """
+    debut = 0
+    if len(reperes) < SEUIL_AUTOMATE:
+        for repere in reperes:
+            index = texte.find(repere, debut)
+            if index != -1:
+                debut = index + len(repere)
+        return debut
+    # Seuls les repères présents font avancer l'indice
+    for repere, suivantes in reperes_presents(texte, reperes):
+        i = bisect_left(suivantes, debut)
+        if i < len(suivantes):
+            debut = suivantes[i] + len(repere)
+    return debut
+
+def _alternative(reperes, forme=lambda repere: repere):
+    """
+    Alternative d'expression régulière équivalente à la suppression des
+    repères un par un, dans l'ordre de la liste : un repère qui contient un
+    repère précédent (forme(précédent) dans forme(repère)) n'est jamais
+    trouvé, puisque le précédent a déjà été supprimé ; il est écarté. Les
+    autres sont essayés du plus long au plus court ("de l’" avant "de").
+    """
+    gardes = []
+    for repere in dict.fromkeys(reperes):
+        if not any(forme(garde) in forme(repere) for garde in gardes):
+            gardes.append(repere)
+    return "|".join(re.escape(repere) for repere in sorted(gardes, key=len, reverse=True))
+
+@lru_cache(maxsize=None)
+def _motif_suppression(reperes):
+    return re.compile(_alternative(reperes))
+
+def supprimer(texte, reperes):
+    """Supprime toutes les occurrences des repères (une seule substitution)."""
+    return _motif_suppression(tuple(reperes)).sub("", texte)
+
+@lru_cache(maxsize=None)
+def _motif_mots(mots):
+    # L'espace qui suit le mot n'est pas consommé : il sert de début au mot suivant
+    return re.compile(" (?:" + _alternative(mots, lambda mot: " " + mot + " ") + ")(?= )")
+
+def supprimer_mots(texte, mots):
+    """Supprime les mots (ou groupes de mots) entourés d'espaces (une seule substitution) : " le chat " -> " chat "."""
+    return _motif_mots(tuple(mots)).sub("", texte)
+
+
 #---------------Traitement des images ----------------------
 mot_cles_images = [
         "avec des images", "contenant une image", "et qui ont des images"
     ]
 
 def identifie_image(requete, mot_cles_images):
-    for mot in mot_cles_images:
-        if mot in requete:
-            requete = requete.replace(mot, "")
-            return requete, True
+    mot = premier_present(requete, mot_cles_images)
+    if mot is not None:
+        requete = requete.replace(mot, "")
+        return requete, True
     return requete, None
 
 
@@ -32,16 +140,12 @@ mots_cles_requete = [
 
 #---------------Traitement des valeurs de retour ----------------------
 def identifie_return(requete, mots_cles_requete):
-    positions = {}
-    for mot in mots_cles_requete:
-        index = requete.find(mot)
-        if index != -1:
-            positions[mot] = index
-
-    # Trie les mots par position d'apparition dans la requête
-    mot_le_plus_tot = min(positions, key=positions.get)
-    requete = requete[positions[mot_le_plus_tot] + len(mot_le_plus_tot):]
-    return requete, mot_le_plus_tot
+    # Mot le plus tôt dans la requête (à position égale, le premier de la liste)
+    mot_le_plus_tot = premiere_occurrence(requete, mots_cles_requete)
+    if mot_le_plus_tot is None:
+        return requete, None
+    position, mot = mot_le_plus_tot
+    return requete[position + len(mot):], mot
 
 #---------------Traitement des rubriques ----------------------
 mots_cles_rubrique = [
@@ -60,11 +164,8 @@ def identifie_rubrique(requete, mots_cles_rubrique):
     sous_texte = requete[start_index:]
 
     # Trouver le mot-clé suivant
-    min_index = len(sous_texte)  # valeur maximale par défaut
-    for mot in mots_cles_rubrique:
-        index = sous_texte.find(mot)
-        if index != -1 and index < min_index:
-            min_index = index
+    suivant = premiere_occurrence(sous_texte, mots_cles_rubrique)
+    min_index = suivant[0] if suivant else len(sous_texte)  # fin du texte par défaut
 
     resultat = sous_texte[:min_index]
     resultat = resultat.replace("est ", "").replace("'", "")
@@ -114,8 +215,7 @@ def identifie_titres(requete, mots_cles_titre):
     #requete_reste = requete.replace(resultat, "")
 
     #sous_texte = partie qui contient le titre. maintenant, il faut le nettoyer et enlever les parties inutiles
-    for mot in mots_cles_titre:
-        resultat = resultat.replace(mot, "")
+    resultat = supprimer(resultat, mots_cles_titre)
     resultat = resultat.replace("mot ", "").replace("terme ", "")
 
     #vérifier si il y a un "et" dans le titre
@@ -123,36 +223,32 @@ def identifie_titres(requete, mots_cles_titre):
     if "et" in resultat:
         resultat = resultat.split(" et ")
         op_titre = "et"
-    if isinstance(resultat, list):
-        for res in resultat:
-            res.replace("\n", "").replace("\t", "").replace("  ", " ")
-    elif resultat in "    \t  \n":
-        resultat = None
-    else:
-        resultat = resultat.replace("\n", "").replace("\t", "").replace("  ", " ")
+    if isinstance(resultat, str):
+        if resultat in "    \t  \n":
+            resultat = None
+        else:
+            resultat = resultat.replace("\n", "").replace("\t", "").replace("  ", " ")
  
     requete_reste = requete[:start_index - len("titre ")] + requete[min_index + len(sous_texte):]
     requete_reste = requete_reste.replace("dont", "").replace("dont", "")
-    for trash in trash_titres:
-        while trash in resultat:
-            resultat = resultat.replace(trash, "")
+    if isinstance(resultat, str):
+        resultat = supprimer(resultat, trash_titres)
 
     return requete_reste, resultat, op_titre
 
 
 #----------------Traitement des dates ----------------------
+chiffre = re.compile(r"\d")
+
 def premier_index_result(texte, mots_cles_dates):
-    # Cherche l'index de chaque mot-clé dans le texte
+    # Cherche le premier mot-clé et le premier chiffre du texte
     indices = []
-    for mot in mots_cles_dates:
-        idx = texte.find(mot)
-        if idx != -1:
-            indices.append(idx)
-    # Cherche l'index du premier chiffre
-    for i, c in enumerate(texte):
-        if c.isdigit():
-            indices.append(i)
-            break
+    premier_mot = premiere_occurrence(texte, mots_cles_dates)
+    if premier_mot:
+        indices.append(premier_mot[0])
+    premier_chiffre = chiffre.search(texte)
+    if premier_chiffre:
+        indices.append(premier_chiffre.start())
     if indices:
         ind = min(indices)
         return ind, texte[ind:]
@@ -160,17 +256,9 @@ def premier_index_result(texte, mots_cles_dates):
         return None, texte
     
 def last_index_result(texte, fin_dates):
-    fin_dates = [
-    "évoquant", "sur", "parlant", "portant", "parlent"
-    ]
-    indices = []
-    for mot in fin_dates:
-        idx = texte.find(mot)
-        if idx != -1:
-            indices.append(idx)
-    if indices:
-        ind = min(indices)
-        print(ind, texte[:ind])
+    fin = premiere_occurrence(texte, fin_dates)
+    if fin:
+        ind = fin[0]
         return ind, texte[:ind]
     else:
         return None, texte
@@ -241,9 +329,7 @@ def identifie_dates(requete, mots_cles_dates):
     requete_reste = requete.replace(sous_texte, "")
 
     #clean up sous_texte
-    mots_trash = ["qui", "dont", "mais"]
-    for mot in mots_trash:
-        sous_texte = sous_texte.replace(mot, "")
+    sous_texte = supprimer(sous_texte, ["qui", "dont", "mais"])
     
     #3 cas possibles:
     #cas niche: on veut pas une date précise
@@ -313,8 +399,7 @@ def identifie_mots_cles(requete, mots_cles_articles):
     if not contains_letter(requete):
         return resultat, None
     #enlever les mots inutiles
-    for word in trash_words:
-        requete = requete.replace(word, "")
+    requete = supprimer(requete, trash_words)
     #requete = requete.replace(" en ", " ")
     
     #identifier les mots clés non voulues
@@ -328,9 +413,9 @@ def identifie_mots_cles(requete, mots_cles_articles):
         resultat["yes"] = requete.replace(niche, "").replace("est-il", "").replace("qui", "").replace(" ", "")
         return resultat, None
     #sinon
-    for mot in mots_cles_articles:
-        if mot in requete:
-            requete = requete[requete.find(mot) + len(mot):]
+    # Pour chaque repère (dans l'ordre de la liste), on garde ce qui suit sa
+    # première occurrence : on avance un indice au lieu de recopier la requête
+    requete = requete[avancer(requete, mots_cles_articles):]
 
     if "ou " in requete or "soit" in requete:
         op_mots_cles = "ou"
@@ -370,12 +455,51 @@ def identifie_mots_cles(requete, mots_cles_articles):
 
     return resultat, op_mots_cles
 
+#----------------Résultats d'analyse figés et mis en cache----------------------
+# L'analyse ne dépend que de la requête normalisée (minuscules, ponctuation) :
+# traiter_requete garde les résultats déjà calculés. Ils sont partagés entre
+# les appelants, donc figés (dict -> MappingProxyType, list -> tuple) ; un
+# appelant qui veut les modifier (correction des mots-clés) travaille sur
+# une copie obtenue par degeler.
+
+cache_analyses = CacheLRU(taille_max=4096)
+
+def statistiques_analyse():
+    return cache_analyses.statistiques()
+
+def figer(valeur):
+    """Copie profondément immuable d'un résultat d'analyse."""
+    if isinstance(valeur, dict):
+        return MappingProxyType({cle: figer(v) for cle, v in valeur.items()})
+    if isinstance(valeur, list):
+        return tuple(figer(v) for v in valeur)
+    return valeur
+
+def degeler(valeur):
+    """Copie modifiable (dict, list) d'un résultat figé."""
+    if isinstance(valeur, (dict, MappingProxyType)):
+        return {cle: degeler(v) for cle, v in valeur.items()}
+    if isinstance(valeur, (list, tuple)):
+        return [degeler(v) for v in valeur]
+    return valeur
+
+def normaliser_requete(requete):
+    # suppression des ponctuations inutiles
+    return requete.lower().replace("?", "").replace(".", "").replace("’", "'")
+
 #----------------Fonction qui regroupe tout----------------------
 
-def traiter_requete(requete):   
-    # suppression des articles et ponctuations inutiless
-    requete = requete.lower()
-    requete = requete.replace("?", "").replace(".", "").replace("’", "'")
+def traiter_requete(requete):
+    """Représentation structurée (figée) de la requête, tirée du cache si la requête normalisée a déjà été analysée."""
+    requete = normaliser_requete(requete)
+    resultats = cache_analyses.get(requete)
+    if resultats is None:
+        resultats = figer(analyser_requete(requete))
+        cache_analyses.put(requete, resultats)
+    return resultats
+
+def analyser_requete(requete):
+    # requete : déjà normalisée (normaliser_requete)
     # Structure pour stocker les composants de la requête
     resultats = {
         "return": None,
@@ -396,8 +520,7 @@ def traiter_requete(requete):
         resultats["operateurs_rubrique"] = op_rubrique
     
     #enlever les articles pour faciliter le traitement des mots clés
-    for article in articles_fr:
-        requete = requete.replace(" " + article + " ", " ")
+    requete = supprimer_mots(requete, articles_fr)
 
     #Extraction des titres
     requete, resultats["titre"], op_titre = identifie_titres(requete, mots_cles_titre)
@@ -416,6 +539,6 @@ def traiter_requete(requete):
 #------------------Main----------------------
 if __name__ == "__main__":
     requete = input("Entrez votre requête en langage naturel : ")
-    resultat = traiter_requete(requete)
+    resultat = degeler(traiter_requete(requete))
     print("Représentation structurée de la requête :")
     print(resultat)
\ No newline at end of file
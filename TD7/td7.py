@@ -323,7 +323,7 @@ def traiter_et_rechercher(requete):
     print("########################################################\n")
 
     # 1. Traitement initial de la requête
-    resultat = traiter_requete(requete)
+    resultat = degeler(traiter_requete(requete))
 
     # 2. Correction orthographique des mots-clés exclus ("no")
     if resultat["mots_cles"]["no"] is not None: